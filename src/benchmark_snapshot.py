@@ -0,0 +1,104 @@
+# benchmark_snapshot.py
+"""
+Measures loading and saving the ads snapshot in the json and binary formats.
+
+A synthetic board of ``--ads`` ads with 0-40 likers each is written once
+per format. Loading is a cold start of the repository, including building
+the ID, per-user and liker indexes; saving writes the whole snapshot as
+every write-through mutation of the json mode does. The baseline is the
+original indented ads.json read and written with the json module alone.
+
+Usage:
+    python3 src/benchmark_snapshot.py --ads 100000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+WORDS = "red blue green shoes shirt hat boots sale new cheap bike phone".split()
+
+
+def make_ads(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(0)
+    ads = []
+    for ad_id in range(1, count + 1):
+        likers = rng.sample(range(1, 1_000_000), rng.randrange(41))
+        ad = {"id": ad_id, "user_id": rng.randrange(1, 5000), "likes": len(likers)}
+        if rng.random() < 0.7:
+            ad["type"] = "text"
+            ad["content"] = " ".join(rng.choice(WORDS) for _ in range(12))
+        else:
+            ad["type"] = "photo"
+            ad["file_id"] = f"AgACAgIAAxkBAAI{ad_id:012d}"
+            ad["caption"] = " ".join(rng.choice(WORDS) for _ in range(4))
+        ad["liked_by"] = sorted(likers)
+        ads.append(ad)
+    return ads
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ads", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="bench-snapshot-"))
+    import logging
+
+    logging.disable(logging.CRITICAL)
+    from utils.storage.json_repository import AdRepository
+
+    ads = make_ads(args.ads)
+    likers = sum(len(ad["liked_by"]) for ad in ads)
+    print(f"{args.ads} ads, {likers} likers, best of {args.repeat}")
+
+    def save_baseline() -> None:
+        with open("baseline.json", "w", encoding="utf-8") as f:
+            json.dump(ads, f, ensure_ascii=False, indent=2)
+
+    def load_baseline() -> None:
+        with open("baseline.json", "r", encoding="utf-8") as f:
+            json.load(f)
+
+    save = best_of(args.repeat, save_baseline)
+    load = best_of(args.repeat, load_baseline)
+    size = os.path.getsize("baseline.json") / 1e6
+    print(
+        f"{'baseline indent=2 json':24} load {load:5.2f}s  save {save:5.2f}s  "
+        f"{size:5.1f} MB"
+    )
+
+    for snapshot_format, path in (("json", "ads.json"), ("binary", "ads.bin")):
+        repository = AdRepository(path, snapshot_format=snapshot_format)
+        repository.replace([dict(ad) for ad in ads])
+
+        def load_repository() -> None:
+            AdRepository(path, snapshot_format=snapshot_format).load()
+
+        load = best_of(args.repeat, load_repository)
+        save = best_of(args.repeat, repository._commit)
+        size = os.path.getsize(path) / 1e6
+        print(
+            f"{snapshot_format + ' repository':24} load {load:5.2f}s  "
+            f"save {save:5.2f}s  {size:5.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# benchmark_workers.py
+"""
+Measures how update throughput scales with the number of worker processes.
+
+Recorded-style updates (/list, /top, /search, /my from many users) are
+dispatched through a WorkerPool to workers running the bot's real
+dispatcher against a shared SQLite database. Bot API requests are answered
+locally after ``--latency`` seconds instead of being sent to Telegram.
+
+Besides the wall-clock throughput, which can only scale with as many CPU
+cores as workers, every worker reports the CPU time it spent on its share
+of the updates and the ingress the CPU time of dispatching them. The
+busiest of those processes bounds the throughput on a host with a core
+per process, so the projected rate shows the scaling on any host.
+
+Usage:
+    python3 src/benchmark_workers.py --workers 1,2,4 --updates 3000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from functools import partial
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ["STORAGE_MODE"] = "sqlite"
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, Message
+
+WORDS = "red blue green shoes shirt hat boots sale new cheap bike phone".split()
+COMMANDS = ["/list", "/top", "/my", "/search shoes", "/search new sale"]
+
+
+class OfflineSession(BaseSession):
+    """
+    Bot session answering every request locally after a fixed delay.
+    """
+
+    def __init__(self, latency: float) -> None:
+        super().__init__()
+        self.latency = latency
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None
+    ) -> Any:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        returning = method.__returning__
+        if returning is Message or getattr(returning, "__origin__", None) is list:
+            message = Message(
+                message_id=1,
+                date=datetime.now(),
+                chat=Chat(id=getattr(method, "chat_id", 1), type="private"),
+            )
+            return message if returning is Message else [message]
+        return True
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator:
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def make_update(update_id: int, user_id: int, text: str) -> Dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "User"},
+            "text": text,
+            "entities": [
+                {"type": "bot_command", "offset": 0, "length": len(text.split()[0])}
+            ],
+        },
+    }
+
+
+def bench_worker(
+    latency: float,
+    reports: multiprocessing.Queue,
+    index: int,
+    queue: multiprocessing.Queue,
+) -> None:
+    import logging
+
+    logging.disable(logging.CRITICAL)
+    import main
+    from utils.workers import run_worker
+
+    async def run() -> None:
+        bot = Bot(token=main.TOKEN, session=OfflineSession(latency))
+
+        cpu_start = 0.0
+
+        async def ready(**kwargs: Any) -> None:
+            nonlocal cpu_start
+            cpu_start = time.process_time()
+            reports.put(("ready", index, time.perf_counter(), 0.0))
+
+        async def drained(**kwargs: Any) -> None:
+            cpu = time.process_time() - cpu_start
+            reports.put(("done", index, time.perf_counter(), cpu))
+
+        main.dp.startup.register(main.on_startup)
+        main.dp.startup.register(ready)
+        main.dp.shutdown.register(drained)
+        main.dp.shutdown.register(main.on_shutdown)
+        await run_worker(main.dp, bot, queue)
+
+    asyncio.run(run())
+
+
+def populate(ads: int) -> None:
+    from utils import storage
+
+    rng = random.Random(0)
+    repository = storage.configure_storage("sqlite")
+    repository.load()
+    if repository.count():
+        return
+    for _ in range(ads):
+        content = " ".join(rng.choice(WORDS) for _ in range(8))
+        storage.add_ad(rng.randrange(1, 500), "text", content=content)
+    repository.close()
+
+
+def measure(
+    workers: int, updates: List[Dict[str, Any]], latency: float
+) -> Tuple[float, float, List[float]]:
+    """
+    Returns the wall-clock rate, the CPU seconds the ingress spent
+    dispatching and the CPU seconds of every worker.
+    """
+    from utils.workers import WorkerPool
+
+    reports = multiprocessing.get_context("spawn").Queue()
+    # Unbounded, so the ingress CPU time excludes waiting for the workers
+    pool = WorkerPool(workers, partial(bench_worker, latency, reports), max_queued=0)
+    pool.start()
+    for _ in range(workers):
+        reports.get()
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for update in updates:
+        pool.dispatch(update)
+    pool.stop()
+    # Includes the queue feeder threads pickling the updates
+    ingress_cpu = time.process_time() - cpu_start
+    finished = []
+    worker_cpu = [0.0] * workers
+    while len(finished) < workers:
+        kind, index, moment, cpu = reports.get()
+        if kind == "done":
+            finished.append(moment)
+            worker_cpu[index] = cpu
+    return len(updates) / (max(finished) - start), ingress_cpu, worker_cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--updates", type=int, default=3000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--ads", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="bench-workers-"))
+    import logging
+
+    logging.disable(logging.CRITICAL)
+    populate(args.ads)
+
+    rng = random.Random(1)
+    updates = [
+        make_update(i, rng.randrange(1, args.users + 1), rng.choice(COMMANDS))
+        for i in range(1, args.updates + 1)
+    ]
+
+    print(f"{os.cpu_count()} CPUs, {args.updates} updates, {args.ads} ads")
+    baseline = projected_baseline = None
+    for workers in [int(n) for n in args.workers.split(",")]:
+        os.environ["WORKERS"] = str(workers)
+        rate, ingress_cpu, worker_cpu = measure(workers, updates, args.latency)
+        projected = args.updates / max(ingress_cpu, *worker_cpu)
+        baseline = baseline or rate
+        projected_baseline = projected_baseline or projected
+        print(
+            f"{workers} workers: {rate:6.0f} updates/s ({rate / baseline:.2f}x), "
+            f"projected {projected:6.0f} updates/s "
+            f"({projected / projected_baseline:.2f}x) on {workers + 1} cores; "
+            f"CPU s ingress {ingress_cpu:.2f}, "
+            f"workers {' '.join(f'{cpu:.2f}' for cpu in worker_cpu)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
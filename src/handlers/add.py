@@ -5,7 +5,7 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from utils.keyboards import get_main_menu_keyboard
-from utils.storage import add_ad
+from utils.storage.aio import add_ad
 from utils.logger import get_logger
 
 router = Router()
@@ -63,7 +63,7 @@ async def save_photo_no_description_callback(
     user_id = callback.from_user.id
 
     if file_id:
-        success = add_ad(user_id, "photo", file_id=file_id)
+        success = await add_ad(user_id, "photo", file_id=file_id)
 
         if success:
             await callback.message.edit_text(
@@ -99,7 +99,7 @@ async def process_photo_description(message: Message, state: FSMContext) -> None
     user_id = message.from_user.id
 
     if file_id:
-        success = add_ad(user_id, "photo", file_id=file_id, caption=message.text)
+        success = await add_ad(user_id, "photo", file_id=file_id, caption=message.text)
 
         if success:
             await message.answer(
@@ -37,6 +37,20 @@ async def list_ads_callback(callback: CallbackQuery, state: FSMContext) -> None:
     logger.info(f"List ads accessed by user {callback.from_user.id}")
 
 
+@router.callback_query(F.data == "my_ads")
+async def my_ads_callback(callback: CallbackQuery, state: FSMContext) -> None:
+    """
+    Handles 'My advertisements' inline button press.
+    """
+    await state.clear()
+
+    from handlers.list import show_my_ads_page
+
+    await show_my_ads_page(callback.message, page=1, user_id=callback.from_user.id)
+    await callback.answer()
+    logger.info(f"My ads accessed by user {callback.from_user.id}")
+
+
 @router.callback_query(F.data == "help")
 async def help_callback(callback: CallbackQuery, state: FSMContext) -> None:
     """
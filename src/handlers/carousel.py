@@ -0,0 +1,229 @@
+# handlers/carousel.py
+from functools import partial
+from typing import Optional, Tuple
+from aiogram import Router, F
+from aiogram.types import (
+    Message,
+    CallbackQuery,
+    InputMediaAudio,
+    InputMediaPhoto,
+    InlineKeyboardMarkup,
+)
+from aiogram.exceptions import TelegramBadRequest
+from handlers.list import (
+    read_page,
+    render_ad,
+    send_single_ad,
+    parse_page_callback,
+    cancel_likes_edit,
+)
+from utils.storage.aio import (
+    count_ads,
+    seek_ads,
+    count_user_ads,
+    seek_user_ads,
+    delete_ad,
+)
+from utils.keyboards import get_carousel_keyboard, get_main_menu_keyboard
+from utils.logger import get_logger
+
+router = Router()
+logger = get_logger(__name__)
+
+# Callback data prefixes of all ads and of the viewer's own ads
+CAROUSEL_PREFIXES = ("carousel", "my_carousel")
+
+
+async def fetch_ad(
+    scope: Optional[int], cursor: Optional[int], backward: bool
+) -> Tuple[Optional[dict], bool, bool]:
+    """
+    Loads the ad next to a cursor.
+
+    Args:
+        scope: ID of the user whose ads are browsed, None for all ads
+        cursor: ID of the ad shown so far, None to start at an end
+        backward: Load the ad before the cursor
+
+    Returns:
+        Tuple: (ad or None, whether an earlier ad exists, whether a later
+        ad exists)
+    """
+    seek = seek_ads if scope is None else partial(seek_user_ads, scope)
+    ads = await read_page(seek, cursor, backward, scope)
+
+    if not ads:
+        if cursor is None:
+            return None, False, False
+        # Nothing left past the cursor; show the nearest end instead
+        return await fetch_ad(scope, None, not backward)
+
+    if backward:
+        return ads[-1], len(ads) > 1, cursor is not None
+    return ads[0], cursor is not None, len(ads) > 1
+
+
+async def show_carousel(
+    message: Message,
+    user_id: int,
+    prefix: str = "carousel",
+    cursor: Optional[int] = None,
+    backward: bool = False,
+    ad_number: int = 1,
+    edit: bool = False,
+) -> None:
+    """
+    Shows one advertisement with action and navigation buttons.
+
+    Args:
+        message: Message to answer, or the carousel message when editing
+        user_id: ID of the user browsing
+        prefix: "carousel" for all ads, "my_carousel" for the user's own
+        cursor: ID of the previously shown ad, None to start at an end
+        backward: Show the ad before the cursor
+        ad_number: Number of the ad to show
+        edit: Replace the carousel message instead of sending a new one
+    """
+    scope = user_id if prefix == "my_carousel" else None
+    total_ads = await (count_ads() if scope is None else count_user_ads(scope))
+    ad, has_prev, has_next = await fetch_ad(scope, cursor, backward)
+
+    if ad is None:
+        if edit:
+            await delete_message(message)
+        await message.answer(
+            "📋 <b>No Advertisements Found</b>\n\n"
+            "There are no advertisements left to browse.",
+            reply_markup=get_main_menu_keyboard(),
+        )
+        return
+
+    if not has_prev:
+        ad_number = 1
+    elif not has_next:
+        ad_number = total_ads
+    else:
+        ad_number = max(2, min(ad_number, total_ads - 1))
+
+    text, _ = render_ad(ad, ad_number, user_id)
+    keyboard = get_carousel_keyboard(
+        ad["id"],
+        ad["user_id"] == user_id,
+        ad_number,
+        total_ads,
+        ad["id"] if has_prev else None,
+        ad["id"] if has_next else None,
+        prefix,
+    )
+
+    if edit:
+        # A pending like count edit would bring the previous ad back
+        cancel_likes_edit(message)
+        if await edit_ad_message(message, ad, text, keyboard):
+            return
+
+    await send_single_ad(message, ad, ad_number, user_id, keyboard=keyboard)
+    if edit:
+        await delete_message(message)
+
+
+async def edit_ad_message(
+    message: Message, ad: dict, text: str, keyboard: InlineKeyboardMarkup
+) -> bool:
+    """
+    Turns the carousel message into another advertisement in place.
+
+    Text can only replace text and media only media; voice messages cannot
+    be edited into or out of at all.
+
+    Returns:
+        bool: False if the message has to be sent anew
+    """
+    try:
+        if ad["type"] == "text":
+            if message.text is None:
+                return False
+            await message.edit_text(text, reply_markup=keyboard)
+        elif ad["type"] in ("photo", "audio"):
+            if not (message.photo or message.audio):
+                return False
+            media_type = InputMediaPhoto if ad["type"] == "photo" else InputMediaAudio
+            await message.edit_media(
+                media_type(media=ad.get("file_id", ""), caption=text),
+                reply_markup=keyboard,
+            )
+        else:
+            return False
+    except TelegramBadRequest as e:
+        if "message is not modified" in str(e):
+            return True
+        logger.warning(f"Failed to edit carousel to ad {ad['id']}: {e}")
+        return False
+
+    return True
+
+
+async def delete_message(message: Message) -> None:
+    """
+    Deletes a replaced carousel message.
+    """
+    try:
+        await message.delete()
+    except TelegramBadRequest as e:
+        logger.error(f"Failed to delete message {message.message_id}: {e}")
+
+
+@router.callback_query(F.data.startswith(tuple(f"{p}:" for p in CAROUSEL_PREFIXES)))
+async def carousel_navigation_callback(callback: CallbackQuery) -> None:
+    """
+    Handles carousel navigation button press.
+    """
+    prefix = callback.data.split(":")[0]
+    cursor, backward, ad_number = parse_page_callback(callback.data)
+
+    await show_carousel(
+        callback.message,
+        callback.from_user.id,
+        prefix,
+        cursor=cursor,
+        backward=backward,
+        ad_number=ad_number,
+        edit=True,
+    )
+    await callback.answer()
+
+
+@router.callback_query(
+    F.data.startswith(tuple(f"{p}_delete:" for p in CAROUSEL_PREFIXES))
+)
+async def carousel_delete_callback(callback: CallbackQuery) -> None:
+    """
+    Handles delete button press in the carousel.
+    Shows the advertisement that took the deleted one's place.
+    """
+    action, ad_id, ad_number = callback.data.split(":")
+    prefix = action.removesuffix("_delete")
+    user_id = callback.from_user.id
+
+    success = await delete_ad(int(ad_id), user_id)
+
+    if not success:
+        await callback.answer(
+            "❌ Failed to delete advertisement. You can only delete your own ads.",
+            show_alert=True,
+        )
+        return
+
+    await callback.answer("🗑️ Advertisement deleted successfully!", show_alert=True)
+    logger.info(f"Ad {ad_id} deleted from the carousel by user {user_id}")
+    # The ad after the deleted one takes its number; the first ad has no
+    # earlier one to step from, so browsing starts over
+    ad_number = int(ad_number)
+    await show_carousel(
+        callback.message,
+        user_id,
+        prefix,
+        cursor=int(ad_id) if ad_number > 1 else None,
+        ad_number=ad_number,
+        edit=True,
+    )
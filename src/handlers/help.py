@@ -19,7 +19,10 @@ async def command_help_handler(message: Message) -> None:
         "/start - Start the bot and show main menu\n"
         "/help - Show this help message\n"
         "/add - Create a new advertisement\n"
-        "/list - Show all saved advertisements\n\n"
+        "/list - Show all saved advertisements\n"
+        "/my - Show your own advertisements\n"
+        "/top - Show the most liked advertisements\n"
+        "/search &lt;words&gt; - Find advertisements by their text\n\n"
         
         "🔹 <b>How to use:</b>\n"
         "• Use menu buttons for easy navigation\n"
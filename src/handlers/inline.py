@@ -0,0 +1,148 @@
+# handlers/inline.py
+from html import escape
+from typing import Any, List, Optional
+from aiogram import Router
+from aiogram.types import (
+    InlineQuery,
+    InlineQueryResultArticle,
+    InlineQueryResultCachedAudio,
+    InlineQueryResultCachedPhoto,
+    InlineQueryResultCachedVoice,
+    InputTextMessageContent,
+)
+from handlers.search import MAX_QUERY_LENGTH
+from utils.inline_cache import inline_cache
+from utils.storage.aio import search_ads, seek_ads
+
+router = Router()
+
+# Telegram shows at most 50 results per answer
+INLINE_RESULTS_PER_PAGE = 20
+# Seconds Telegram may reuse an answer for the same query from any user
+INLINE_CACHE_TIME = 30
+# Telegram limits the title and description shown in the result list
+INLINE_TITLE_LENGTH = 64
+INLINE_DESCRIPTION_LENGTH = 128
+
+
+def parse_offset(offset: str) -> Optional[int]:
+    """
+    Returns the ID an inline page continues below, None for the first page.
+    """
+    try:
+        return int(offset)
+    except ValueError:
+        return None
+
+
+def shorten(text: str, length: int) -> str:
+    """
+    Returns the first line of a text cut to ``length`` characters.
+    """
+    line = text.strip().split("\n", 1)[0]
+    return line if len(line) <= length else line[: length - 1] + "…"
+
+
+def build_inline_result(ad: dict) -> Any:
+    """
+    Returns the inline query result sending an advertisement.
+
+    User text is escaped: a single ad with broken markup would make
+    Telegram reject the whole answer.
+
+    Args:
+        ad: Advertisement data
+
+    Returns:
+        InlineQueryResult: Article for text ads, cached media otherwise
+    """
+    likes = ad.get("likes", 0)
+    result = inline_cache.get_result(ad["id"], likes)
+    if result is not None:
+        return result
+
+    result_id = str(ad["id"])
+    header = f"❤️ {likes} | Type: {ad['type'].upper()}"
+
+    if ad["type"] == "text":
+        content = ad.get("content", "No content")
+        result = InlineQueryResultArticle(
+            id=result_id,
+            title=shorten(content, INLINE_TITLE_LENGTH) or "Advertisement",
+            description=shorten(f"{header} | {content}", INLINE_DESCRIPTION_LENGTH),
+            input_message_content=InputTextMessageContent(
+                message_text=f"📝 <b>{header}</b>\n\n{escape(content)}"
+            ),
+        )
+    else:
+        icon = "📸" if ad["type"] == "photo" else "🎵"
+        caption = f"{icon} <b>{header}</b>"
+        if ad.get("caption"):
+            caption += f"\n\n{escape(ad['caption'])}"
+        file_id = ad.get("file_id", "")
+
+        if ad["type"] == "photo":
+            result = InlineQueryResultCachedPhoto(
+                id=result_id, photo_file_id=file_id, caption=caption
+            )
+        elif ad["type"] == "audio":
+            result = InlineQueryResultCachedAudio(
+                id=result_id, audio_file_id=file_id, caption=caption
+            )
+        else:
+            result = InlineQueryResultCachedVoice(
+                id=result_id,
+                voice_file_id=file_id,
+                title=shorten(
+                    ad.get("caption") or "Voice message", INLINE_TITLE_LENGTH
+                ),
+                caption=caption,
+            )
+
+    return inline_cache.put_result(ad["id"], likes, result)
+
+
+async def read_inline_page(query: str, cursor: Optional[int]) -> List[dict]:
+    """
+    Returns up to INLINE_RESULTS_PER_PAGE + 1 ads matching a query, newest
+    first, that are older than the ad with ID ``cursor``. An empty query
+    matches every ad.
+    """
+    limit = INLINE_RESULTS_PER_PAGE + 1
+    if query:
+        ads = await search_ads(query, cursor, limit, backward=True)
+    else:
+        ads = await seek_ads(cursor, limit, backward=True)
+    return ads[::-1]
+
+
+@router.inline_query()
+async def inline_query_handler(inline_query: InlineQuery) -> None:
+    """
+    Handles inline queries.
+    Offers the advertisements matching the typed words, newest first, a
+    page at a time; Telegram requests the next page with ``next_offset``.
+    """
+    query = " ".join(inline_query.query.casefold().split())[:MAX_QUERY_LENGTH]
+    key = (query, parse_offset(inline_query.offset))
+
+    page = inline_cache.get_page(key)
+    if page is None:
+        version = inline_cache.version
+        ads = await read_inline_page(*key)
+        page_ads = ads[:INLINE_RESULTS_PER_PAGE]
+        has_more = len(ads) > INLINE_RESULTS_PER_PAGE
+        next_offset = str(page_ads[-1]["id"]) if has_more else ""
+        results = [build_inline_result(ad) for ad in page_ads]
+        inline_cache.put_page(
+            key, results, next_offset, [ad["id"] for ad in page_ads], version
+        )
+        page = results, next_offset
+
+    results, next_offset = page
+    await inline_query.answer(
+        results,
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=False,
+        next_offset=next_offset,
+    )
@@ -1,20 +1,52 @@
+import asyncio
+import re
+from functools import partial
+from typing import Any, Optional, Tuple, Callable, Awaitable, List, Dict, Set
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import (
+    Message,
+    CallbackQuery,
+    InputMediaPhoto,
+    InlineKeyboardMarkup,
+)
 from aiogram.exceptions import TelegramBadRequest
-from utils.storage import load_ads, like_ad, delete_ad, get_ad_by_id
+from utils.storage.aio import (
+    count_ads,
+    seek_ads,
+    count_user_ads,
+    seek_user_ads,
+    like_ad,
+    delete_ad,
+)
 from utils.keyboards import (
     get_ad_actions_keyboard,
     get_main_menu_keyboard,
     get_ads_navigation_keyboard,
+    get_ad_group_keyboard,
 )
 from utils.logger import get_logger
+from utils.page_cache import page_cache
 from math import ceil
 
 router = Router()
 logger = get_logger(__name__)
 
 ADS_PER_PAGE = 5
+# Send runs of consecutive photo ads as one album with a shared like keyboard
+GROUP_PHOTOS = False
+# Telegram albums hold 2 to 10 items
+MEDIA_GROUP_MAX = 10
+# Browse ads one per message, moving through them by editing that message
+CAROUSEL = False
+# Seconds to collect likes of a message before its count is edited
+LIKE_EDIT_DELAY = 1.0
+LIKES_PATTERN = re.compile(r"❤️ \d+")
+
+# (chat ID, message ID) -> (message, like count) of scheduled count edits
+pending_likes_edits: Dict[Tuple[int, int], Tuple[Message, int]] = {}
+# References to the running edit tasks, which asyncio only keeps weakly
+likes_edit_tasks: Set[asyncio.Task] = set()
 
 
 @router.message(Command("list"))
@@ -26,10 +58,108 @@ async def command_list_handler(message: Message) -> None:
     await show_ads_page(message, page=1, user_id=message.from_user.id)
 
 
-async def show_ads_page(message: Message, page: int = 1, user_id: int = None) -> None:
-    ads = load_ads()
+@router.message(Command("my"))
+async def command_my_handler(message: Message) -> None:
+    """
+    Handles /my command.
+    Shows the advertisements created by the user with pagination.
+    """
+    await show_my_ads_page(message, page=1, user_id=message.from_user.id)
+
+
+async def read_page(
+    seek: Callable[..., Awaitable[List[dict]]],
+    cursor: Optional[int],
+    backward: bool,
+    scope: Optional[int] = None,
+) -> List[dict]:
+    """
+    Returns up to ADS_PER_PAGE + 1 ads next to a cursor, from the page cache
+    when possible.
+
+    Args:
+        seek: Storage function returning ads next to a cursor
+        cursor: ID of the ad the read starts after (or ends before)
+        backward: Read the ads before the cursor
+        scope: ID of the user whose ads ``seek`` returns, None for all ads
+
+    Returns:
+        List[dict]: Ads in creation order
+    """
+    key = (scope, cursor, backward)
+    page_ads = page_cache.get_page(key)
+    if page_ads is None:
+        version = page_cache.version
+        page_ads = await seek(cursor, ADS_PER_PAGE + 1, backward)
+        page_cache.put_page(key, page_ads, ADS_PER_PAGE + 1, version)
+    return page_ads
+
+
+def ad_id_cursor(ad: dict) -> int:
+    """
+    Returns the cursor of an ad in creation order.
+    """
+    return ad["id"]
+
 
-    if not ads:
+async def fetch_page(
+    read: Callable[[Any, bool], Awaitable[List[dict]]],
+    cursor: Any,
+    backward: bool,
+    page: int,
+    total_pages: int,
+    cursor_of: Callable[[dict], Any] = ad_id_cursor,
+) -> Tuple[List[dict], Any, Any, int]:
+    """
+    Loads the page next to a cursor. One extra ad is requested to find out
+    whether another page follows in that direction.
+
+    Args:
+        read: Function returning up to ADS_PER_PAGE + 1 ads next to a cursor
+        cursor: Cursor of the ad the page starts after (or ends before)
+        backward: Load the page before the cursor
+        page: Page number shown to the user
+        total_pages: Total number of pages
+        cursor_of: Function returning the cursor of an ad
+
+    Returns:
+        Tuple: (ads, previous page cursor, next page cursor, page number)
+    """
+    page_ads = await read(cursor, backward)
+    has_more = len(page_ads) > ADS_PER_PAGE
+
+    if backward:
+        page_ads = page_ads[-ADS_PER_PAGE:]
+        has_prev, has_next = has_more, cursor is not None
+        if not has_more:
+            page = 1
+    else:
+        page_ads = page_ads[:ADS_PER_PAGE]
+        has_prev, has_next = cursor is not None, has_more
+        if not has_more:
+            page = total_pages
+
+    if not page_ads and cursor is not None:
+        # Everything past the cursor was deleted; show the nearest end instead
+        if backward:
+            return await fetch_page(read, None, False, 1, total_pages, cursor_of)
+        return await fetch_page(read, None, True, total_pages, total_pages, cursor_of)
+
+    prev_cursor = cursor_of(page_ads[0]) if has_prev and page_ads else None
+    next_cursor = cursor_of(page_ads[-1]) if has_next and page_ads else None
+    return page_ads, prev_cursor, next_cursor, max(1, min(page, total_pages))
+
+
+async def show_ads_page(
+    message: Message,
+    page: int = 1,
+    user_id: int = None,
+    cursor: Optional[int] = None,
+    backward: bool = False,
+) -> None:
+    total_ads = await count_ads()
+
+    if not total_ads:
         await message.answer(
             "📋 <b>No Advertisements Found</b>\n\n"
             "There are no advertisements yet. Be the first to create one!",
@@ -37,32 +167,310 @@ async def show_ads_page(message: Message, page: int = 1, user_id: int = None) ->
         )
         return
 
-    total_ads = len(ads)
-    total_pages = ceil(total_ads / ADS_PER_PAGE)
-    start_idx = (page - 1) * ADS_PER_PAGE
-    end_idx = min(start_idx + ADS_PER_PAGE, total_ads)
+    if CAROUSEL:
+        from handlers.carousel import show_carousel
 
-    page_ads = ads[start_idx:end_idx]
+        await show_carousel(message, user_id or message.from_user.id)
+        return
 
-    header_text = (
-        f"📋 <b>Advertisements</b>\n"
-        f"Page {page}/{total_pages} | Total: {total_ads}\n"
-        f"{'='*30}\n\n"
+    total_pages = ceil(total_ads / ADS_PER_PAGE)
+    page_ads, prev_cursor, next_cursor, page = await fetch_page(
+        partial(read_page, seek_ads), cursor, backward, page, total_pages
+    )
+
+    await send_ads_page(
+        message,
+        "📋 <b>Advertisements</b>",
+        page_ads,
+        page,
+        total_pages,
+        total_ads,
+        user_id or message.from_user.id,
+        prev_cursor,
+        next_cursor,
     )
 
-    await message.answer(header_text)
 
+async def show_my_ads_page(
+    message: Message,
+    page: int = 1,
+    user_id: int = None,
+    cursor: Optional[int] = None,
+    backward: bool = False,
+) -> None:
+    """
+    Shows a page of the advertisements created by the user.
+    """
     current_user_id = user_id or message.from_user.id
+    total_ads = await count_user_ads(current_user_id)
+
+    if not total_ads:
+        await message.answer(
+            "🗂 <b>No Advertisements Yet</b>\n\n"
+            "You haven't created any advertisements yet. "
+            "Send me a text, photo or audio to create one!",
+            reply_markup=get_main_menu_keyboard(),
+        )
+        return
+
+    if CAROUSEL:
+        from handlers.carousel import show_carousel
+
+        await show_carousel(message, current_user_id, prefix="my_carousel")
+        return
+
+    total_pages = ceil(total_ads / ADS_PER_PAGE)
+    page_ads, prev_cursor, next_cursor, page = await fetch_page(
+        partial(
+            read_page, partial(seek_user_ads, current_user_id), scope=current_user_id
+        ),
+        cursor,
+        backward,
+        page,
+        total_pages,
+    )
+
+    await send_ads_page(
+        message,
+        "🗂 <b>My Advertisements</b>",
+        page_ads,
+        page,
+        total_pages,
+        total_ads,
+        current_user_id,
+        prev_cursor,
+        next_cursor,
+        prefix="my_page",
+    )
+
+
+async def send_ads_page(
+    message: Message,
+    title: str,
+    page_ads: list,
+    page: int,
+    total_pages: int,
+    total_ads: int,
+    current_user_id: int,
+    prev_cursor: Optional[int] = None,
+    next_cursor: Optional[int] = None,
+    prefix: str = "page",
+) -> None:
+    """
+    Sends a page header, the ads of the page and the navigation keyboard.
+
+    Args:
+        message: Message object
+        title: Page title
+        page_ads: Advertisements on the page
+        page: Current page
+        total_pages: Total number of pages
+        total_ads: Total number of advertisements
+        current_user_id: ID of current user viewing the page
+        prev_cursor: Cursor of the previous page, None on the first page
+        next_cursor: Cursor of the next page, None on the last page
+        prefix: Callback data prefix of the navigation buttons
+    """
+    header_text = (
+        f"{title}\n" f"Page {page}/{total_pages} | Total: {total_ads}\n" f"{'='*30}\n\n"
+    )
+
+    # Telegram only keeps the order of messages sent one after another, so
+    # the sends form a pipeline: everything is rendered while the header is
+    # in flight, and every request goes out as soon as the previous one is
+    # acknowledged
+    header = asyncio.ensure_future(message.answer(header_text))
+    await asyncio.sleep(0)
 
-    for i, ad in enumerate(page_ads, start=start_idx + 1):
-        await send_single_ad(message, ad, i, current_user_id)
+    start_idx = (page - 1) * ADS_PER_PAGE
+    numbered_ads = list(enumerate(page_ads, start=start_idx + 1))
+    sends = [
+        prepare_batch(message, batch, current_user_id)
+        for batch in group_ads(numbered_ads, current_user_id)
+    ]
+    nav_keyboard = get_ads_navigation_keyboard(
+        page, total_pages, prev_cursor, next_cursor, prefix
+    )
 
-    nav_keyboard = get_ads_navigation_keyboard(page, total_pages)
+    await header
+    for send in sends:
+        await send()
     await message.answer("📑 Navigation:", reply_markup=nav_keyboard)
 
 
+def prepare_batch(
+    message: Message, batch: List[Tuple[int, dict]], current_user_id: int
+) -> Callable[[], Awaitable[None]]:
+    """
+    Renders a batch of ads from :func:`group_ads` ahead of sending it.
+
+    Args:
+        message: Message object
+        batch: (ad number, ad) pairs sent with one request
+        current_user_id: ID of current user viewing the ads
+
+    Returns:
+        Callable: Sends the batch when awaited
+    """
+    if len(batch) > 1:
+        return partial(
+            send_photo_group,
+            message,
+            batch,
+            current_user_id,
+            media=album_media(batch),
+            keyboard=get_ad_group_keyboard(
+                [(ad_number, ad["id"]) for ad_number, ad in batch]
+            ),
+        )
+
+    ad_number, ad = batch[0]
+    return partial(
+        send_single_ad,
+        message,
+        ad,
+        ad_number,
+        current_user_id,
+        rendered=render_ad(ad, ad_number, current_user_id),
+    )
+
+
+def group_ads(
+    numbered_ads: List[Tuple[int, dict]], current_user_id: int
+) -> List[List[Tuple[int, dict]]]:
+    """
+    Splits the ads of a page into batches that are sent with one request.
+
+    With GROUP_PHOTOS enabled, runs of consecutive photo ads owned by other
+    users become one batch; albums cannot carry a delete button, so the
+    user's own ads are always sent on their own.
+
+    Args:
+        numbered_ads: (ad number, ad) pairs in display order
+        current_user_id: ID of current user viewing the page
+
+    Returns:
+        List: Batches of (ad number, ad) pairs in display order
+    """
+    batches: List[List[Tuple[int, dict]]] = []
+    grouping = False
+
+    for ad_number, ad in numbered_ads:
+        groupable = (
+            GROUP_PHOTOS and ad["type"] == "photo" and ad["user_id"] != current_user_id
+        )
+        if groupable and grouping and len(batches[-1]) < MEDIA_GROUP_MAX:
+            batches[-1].append((ad_number, ad))
+        else:
+            batches.append([(ad_number, ad)])
+        grouping = groupable
+
+    return batches
+
+
+def format_ad_header(ad: dict, ad_number: int) -> str:
+    """
+    Returns the header line shown above an advertisement.
+    """
+    likes = ad.get("likes", 0)
+    return f"#{ad_number} | ❤️ {likes} | Type: {ad['type'].upper()}"
+
+
+def album_media(numbered_ads: List[Tuple[int, dict]]) -> List[InputMediaPhoto]:
+    """
+    Returns the album items of photo advertisements.
+    """
+    media = []
+    for ad_number, ad in numbered_ads:
+        caption_text = f"📸 <b>{format_ad_header(ad, ad_number)}</b>"
+        if ad.get("caption"):
+            caption_text += f"\n\n{ad['caption']}"
+        media.append(InputMediaPhoto(media=ad.get("file_id", ""), caption=caption_text))
+    return media
+
+
+async def send_photo_group(
+    message: Message,
+    numbered_ads: List[Tuple[int, dict]],
+    current_user_id: int,
+    media: Optional[List[InputMediaPhoto]] = None,
+    keyboard: Optional[InlineKeyboardMarkup] = None,
+) -> None:
+    """
+    Sends photo advertisements as one album followed by a keyboard with a
+    like button per ad.
+
+    Args:
+        message: Message object
+        numbered_ads: (ad number, ad) pairs of photo ads
+        current_user_id: ID of current user viewing the ads
+        media: Album items prepared by :func:`album_media`
+        keyboard: Like keyboard prepared by :func:`get_ad_group_keyboard`
+    """
+    media = media or album_media(numbered_ads)
+
+    try:
+        await message.answer_media_group(media)
+    except TelegramBadRequest as e:
+        logger.error(f"Failed to send album of {len(media)} ads: {e}")
+        for ad_number, ad in numbered_ads:
+            await send_single_ad(message, ad, ad_number, current_user_id)
+        return
+
+    await message.answer(
+        "❤️ Like an advertisement from the album:",
+        reply_markup=keyboard
+        or get_ad_group_keyboard(
+            [(ad_number, ad["id"]) for ad_number, ad in numbered_ads]
+        ),
+    )
+
+
+def render_ad(
+    ad: dict, ad_number: int, current_user_id: int
+) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Returns the text (or caption) and keyboard of an advertisement.
+
+    The result depends only on the ad, its like count, its number and
+    whether the viewer owns it, so it is cached per ad under that key and
+    dropped by the page cache when the ad changes.
+
+    Args:
+        ad: Advertisement data
+        ad_number: Sequential number of the ad
+        current_user_id: ID of current user viewing the ad
+
+    Returns:
+        Tuple: (text or caption, keyboard)
+    """
+    is_owner = ad["user_id"] == current_user_id
+    key = (ad.get("likes", 0), ad_number, is_owner)
+    rendered = page_cache.get_rendered(ad["id"], key)
+    if rendered is not None:
+        return rendered
+
+    keyboard = get_ad_actions_keyboard(ad["id"], current_user_id, ad["user_id"])
+    header = format_ad_header(ad, ad_number)
+
+    if ad["type"] == "text":
+        text = f"📝 <b>{header}</b>\n\n{ad.get('content', 'No content')}"
+    else:
+        icon = "📸" if ad["type"] == "photo" else "🎵"
+        text = f"{icon} <b>{header}</b>"
+        if ad.get("caption"):
+            text += f"\n\n{ad['caption']}"
+
+    return page_cache.put_rendered(ad["id"], key, (text, keyboard))
+
+
 async def send_single_ad(
-    message: Message, ad: dict, ad_number: int, current_user_id: int
+    message: Message,
+    ad: dict,
+    ad_number: int,
+    current_user_id: int,
+    keyboard: Optional[InlineKeyboardMarkup] = None,
+    rendered: Optional[Tuple[str, InlineKeyboardMarkup]] = None,
 ) -> None:
     """
     Sends a single advertisement with action buttons.
@@ -72,51 +480,34 @@ async def send_single_ad(
         ad: Advertisement data
         ad_number: Sequential number of the ad
         current_user_id: ID of current user viewing the ad
+        keyboard: Keyboard to send instead of the ad's action buttons
+        rendered: Result of :func:`render_ad` prepared ahead of sending
     """
     ad_id = ad["id"]
     ad_type = ad["type"]
     likes = ad.get("likes", 0)
-    owner_id = ad["user_id"]
-
-    keyboard = get_ad_actions_keyboard(ad_id, current_user_id, owner_id)
 
-    header = f"#{ad_number} | ❤️ {likes} | Type: {ad_type.upper()}"
+    text, actions_keyboard = rendered or render_ad(ad, ad_number, current_user_id)
+    keyboard = keyboard or actions_keyboard
 
     try:
         if ad_type == "text":
-            content = ad.get("content", "No content")
-            await message.answer(
-                f"📝 <b>{header}</b>\n\n{content}", reply_markup=keyboard
-            )
+            await message.answer(text, reply_markup=keyboard)
 
         elif ad_type == "photo":
-            file_id = ad.get("file_id", "")
-            caption = ad.get("caption", "")
-
-            caption_text = f"📸 <b>{header}</b>"
-            if caption:
-                caption_text += f"\n\n{caption}"
-
             await message.answer_photo(
-                photo=file_id, caption=caption_text, reply_markup=keyboard
+                photo=ad.get("file_id", ""), caption=text, reply_markup=keyboard
             )
 
-        elif ad_type in ["audio", "voice"]:
-            file_id = ad.get("file_id", "")
-            caption = ad.get("caption", "")
-
-            caption_text = f"🎵 <b>{header}</b>"
-            if caption:
-                caption_text += f"\n\n{caption}"
+        elif ad_type == "audio":
+            await message.answer_audio(
+                audio=ad.get("file_id", ""), caption=text, reply_markup=keyboard
+            )
 
-            if ad_type == "audio":
-                await message.answer_audio(
-                    audio=file_id, caption=caption_text, reply_markup=keyboard
-                )
-            else:
-                await message.answer_voice(
-                    voice=file_id, caption=caption_text, reply_markup=keyboard
-                )
+        elif ad_type == "voice":
+            await message.answer_voice(
+                voice=ad.get("file_id", ""), caption=text, reply_markup=keyboard
+            )
 
     except TelegramBadRequest as e:
         logger.error(f"Failed to send ad {ad_id}: {e}")
@@ -136,47 +527,76 @@ async def like_ad_callback(callback: CallbackQuery) -> None:
     ad_id = int(callback.data.split(":")[1])
     user_id = callback.from_user.id
 
-    success, message_text = like_ad(ad_id, user_id)
+    success, message_text, ad = await like_ad(ad_id, user_id)
 
-    if success:
-        ad = get_ad_by_id(ad_id)
-        if ad:
-            await callback.answer(f"❤️ {message_text}", show_alert=True)
+    if not success:
+        await callback.answer(f"❌ {message_text}", show_alert=True)
+        return
 
-            new_keyboard = get_ad_actions_keyboard(
-                ad_id, callback.from_user.id, ad["user_id"]
-            )
+    await callback.answer(f"❤️ {message_text}", show_alert=True)
 
-            if callback.message.caption:
-                new_caption = callback.message.caption
-                import re
-
-                pattern = r"❤️ \d+"
-                new_caption = re.sub(pattern, f"❤️ {ad['likes']}", new_caption)
-
-                try:
-                    await callback.message.edit_caption(
-                        caption=new_caption, reply_markup=new_keyboard
-                    )
-                except TelegramBadRequest:
-                    pass
-            else:
-                new_text = callback.message.text
-                import re
-
-                pattern = r"❤️ \d+"
-                new_text = re.sub(pattern, f"❤️ {ad['likes']}", new_text)
-
-                try:
-                    await callback.message.edit_text(
-                        text=new_text, reply_markup=new_keyboard
-                    )
-                except TelegramBadRequest:
-                    pass
+    # The like keyboard under an album shows no count to update
+    shown_text = callback.message.caption or callback.message.text or ""
+    if LIKES_PATTERN.search(shown_text):
+        schedule_likes_edit(callback.message, ad["likes"])
+
+
+def schedule_likes_edit(message: Message, likes: int) -> None:
+    """
+    Updates the like count shown in a message after LIKE_EDIT_DELAY.
+
+    Likes arriving for the same message in the meantime only raise the
+    count of the pending edit, so a burst of likes costs a single edit.
+
+    Args:
+        message: Message showing the ad
+        likes: Like count after the like
+    """
+    key = (message.chat.id, message.message_id)
+    pending = pending_likes_edits.get(key)
+    if pending is not None:
+        # Likes are answered concurrently, so counts may arrive out of order
+        pending_likes_edits[key] = (message, max(pending[1], likes))
+        return
+
+    pending_likes_edits[key] = (message, likes)
+    task = asyncio.create_task(edit_likes_later(key))
+    likes_edit_tasks.add(task)
+    task.add_done_callback(likes_edit_tasks.discard)
+
+
+def cancel_likes_edit(message: Message) -> None:
+    """
+    Drops the pending like count edit of a message that shows another ad now.
+    """
+    pending_likes_edits.pop((message.chat.id, message.message_id), None)
+
+
+async def edit_likes_later(key: Tuple[int, int]) -> None:
+    """
+    Waits for LIKE_EDIT_DELAY and writes the latest like count into the
+    message, keeping its formatting and buttons.
+    """
+    await asyncio.sleep(LIKE_EDIT_DELAY)
+    pending = pending_likes_edits.pop(key, None)
+    if pending is None:
+        return
+
+    message, likes = pending
+    shown_html = message.html_text
+    new_html = LIKES_PATTERN.sub(f"❤️ {likes}", shown_html, count=1)
+    if new_html == shown_html:
+        return
+
+    try:
+        if message.caption is not None:
+            await message.edit_caption(
+                caption=new_html, reply_markup=message.reply_markup
+            )
         else:
-            await callback.answer("❌ Advertisement not found", show_alert=True)
-    else:
-        await callback.answer(f"❌ {message_text}", show_alert=True)
+            await message.edit_text(new_html, reply_markup=message.reply_markup)
+    except TelegramBadRequest as e:
+        logger.warning(f"Failed to update likes of message {key[1]}: {e}")
 
 
 @router.callback_query(F.data.startswith("delete_ad:"))
@@ -188,7 +608,7 @@ async def delete_ad_callback(callback: CallbackQuery) -> None:
     ad_id = int(callback.data.split(":")[1])
     user_id = callback.from_user.id
 
-    success = delete_ad(ad_id, user_id)
+    success = await delete_ad(ad_id, user_id)
 
     if success:
         await callback.answer("🗑️ Advertisement deleted successfully!", show_alert=True)
@@ -218,15 +638,52 @@ async def current_page_callback(callback: CallbackQuery) -> None:
     await callback.answer("You are currently viewing this page")
 
 
+def parse_page_callback(
+    data: str, parse_cursor: Callable[[str], Any] = int
+) -> Tuple[Any, bool, int]:
+    """
+    Parses "<prefix>:<next|prev>:<cursor>:<page>" navigation callback data.
+    Buttons in the old "<prefix>:<page>" form open the first page.
+
+    Args:
+        data: Callback data
+        parse_cursor: Function turning the cursor text into a cursor
+
+    Returns:
+        Tuple: (cursor, backward, page)
+    """
+    parts = data.split(":")
+    if len(parts) != 4:
+        return None, False, 1
+    return parse_cursor(parts[2]), parts[1] == "prev", int(parts[3])
+
+
 @router.callback_query(F.data.startswith("page:"))
 async def page_navigation_callback(callback: CallbackQuery) -> None:
     """
     Handles page navigation button press.
     """
-    page = int(callback.data.split(":")[1])
+    cursor, backward, page = parse_page_callback(callback.data)
     user_id = callback.from_user.id
 
     # Edit the original message to show new page
     await callback.message.edit_text("Loading...")
-    await show_ads_page(callback.message, page=page, user_id=user_id)
+    await show_ads_page(
+        callback.message, page=page, user_id=user_id, cursor=cursor, backward=backward
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("my_page:"))
+async def my_page_navigation_callback(callback: CallbackQuery) -> None:
+    """
+    Handles page navigation button press in the user's own advertisements.
+    """
+    cursor, backward, page = parse_page_callback(callback.data)
+    user_id = callback.from_user.id
+
+    await callback.message.edit_text("Loading...")
+    await show_my_ads_page(
+        callback.message, page=page, user_id=user_id, cursor=cursor, backward=backward
+    )
     await callback.answer()
@@ -7,7 +7,7 @@ from utils.keyboards import (
     get_photo_description_keyboard,
     get_main_menu_keyboard,
 )
-from utils.storage import add_ad
+from utils.storage.aio import add_ad
 from utils.logger import get_logger
 
 router = Router()
@@ -41,7 +41,7 @@ async def confirm_text_ad_callback(callback: CallbackQuery, state: FSMContext) -
     user_id = callback.from_user.id
 
     if text_content:
-        success = add_ad(user_id, "text", content=text_content)
+        success = await add_ad(user_id, "text", content=text_content)
 
         if success:
             await callback.message.edit_text(
@@ -114,7 +114,7 @@ async def handle_audio_message(message: Message) -> None:
     if message.audio.performer:
         caption += f" | Artist: {message.audio.performer}"
 
-    success = add_ad(user_id, "audio", file_id=file_id, caption=caption)
+    success = await add_ad(user_id, "audio", file_id=file_id, caption=caption)
 
     if success:
         await message.answer(
@@ -143,7 +143,7 @@ async def handle_voice_message(message: Message) -> None:
     duration = message.voice.duration
     caption = f"Voice message ({duration}s)" if duration else "Voice message"
 
-    success = add_ad(user_id, "voice", file_id=file_id, caption=caption)
+    success = await add_ad(user_id, "voice", file_id=file_id, caption=caption)
 
     if success:
         await message.answer(
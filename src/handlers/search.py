@@ -0,0 +1,116 @@
+# handlers/search.py
+from functools import partial
+from html import escape
+from math import ceil
+from typing import Optional, List
+from aiogram import Router, F
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message, CallbackQuery
+from handlers.list import ADS_PER_PAGE, fetch_page, send_ads_page, parse_page_callback
+from utils.storage.aio import search_ads, count_search_results
+from utils.keyboards import get_main_menu_keyboard
+
+router = Router()
+
+# Longer queries are cut to this many characters
+MAX_QUERY_LENGTH = 200
+
+
+@router.message(Command("search"))
+async def command_search_handler(
+    message: Message, command: CommandObject, state: FSMContext
+) -> None:
+    """
+    Handles /search command.
+    Shows the advertisements matching the given words with pagination.
+    """
+    query = (command.args or "").strip()[:MAX_QUERY_LENGTH]
+    if not query:
+        await message.answer(
+            "🔍 <b>Search</b>\n\n"
+            "Usage: /search &lt;words&gt;\n"
+            "Shows the ads containing words that start with every given word."
+        )
+        return
+
+    # Callback data is too short to carry the query, so the page buttons
+    # read it from the user's state
+    await state.update_data(search_query=query)
+    await show_search_page(message, query, page=1, user_id=message.from_user.id)
+
+
+async def read_search_page(
+    query: str, cursor: Optional[int], backward: bool
+) -> List[dict]:
+    """
+    Returns up to ADS_PER_PAGE + 1 matching ads next to a cursor.
+    """
+    return await search_ads(query, cursor, ADS_PER_PAGE + 1, backward)
+
+
+async def show_search_page(
+    message: Message,
+    query: str,
+    page: int = 1,
+    user_id: int = None,
+    cursor: Optional[int] = None,
+    backward: bool = False,
+) -> None:
+    """
+    Shows a page of the advertisements matching a query.
+    """
+    total_ads = await count_search_results(query)
+
+    if not total_ads:
+        await message.answer(
+            "🔍 <b>Nothing Found</b>\n\n" f"No advertisements match “{escape(query)}”.",
+            reply_markup=get_main_menu_keyboard(),
+        )
+        return
+
+    total_pages = ceil(total_ads / ADS_PER_PAGE)
+    page_ads, prev_cursor, next_cursor, page = await fetch_page(
+        partial(read_search_page, query), cursor, backward, page, total_pages
+    )
+
+    await send_ads_page(
+        message,
+        f"🔍 <b>Search: {escape(query)}</b>",
+        page_ads,
+        page,
+        total_pages,
+        total_ads,
+        user_id or message.from_user.id,
+        prev_cursor,
+        next_cursor,
+        prefix="search_page",
+    )
+
+
+@router.callback_query(F.data.startswith("search_page:"))
+async def search_page_navigation_callback(
+    callback: CallbackQuery, state: FSMContext
+) -> None:
+    """
+    Handles page navigation button press in search results.
+    """
+    query = (await state.get_data()).get("search_query")
+    if not query:
+        await callback.answer(
+            "Search results expired, please run /search again", show_alert=True
+        )
+        return
+
+    cursor, backward, page = parse_page_callback(callback.data)
+
+    await callback.message.edit_text("Loading...")
+    await show_search_page(
+        callback.message,
+        query,
+        page=page,
+        user_id=callback.from_user.id,
+        cursor=cursor,
+        backward=backward,
+    )
+    await callback.answer()
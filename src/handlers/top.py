@@ -0,0 +1,110 @@
+# handlers/top.py
+from math import ceil
+from typing import Optional, Tuple, List
+from aiogram import Router, F
+from aiogram.filters import Command
+from aiogram.types import Message, CallbackQuery
+from handlers.list import ADS_PER_PAGE, fetch_page, send_ads_page, parse_page_callback
+from utils.storage.aio import count_ads, get_top_ads
+from utils.keyboards import get_main_menu_keyboard
+
+router = Router()
+
+
+@router.message(Command("top"))
+async def command_top_handler(message: Message) -> None:
+    """
+    Handles /top command.
+    Shows the advertisements ranked by likes with pagination.
+    """
+    await show_top_page(message, page=1, user_id=message.from_user.id)
+
+
+def format_top_cursor(cursor: Tuple[int, int]) -> str:
+    """
+    Returns the callback data form "<likes>_<id>" of a ranking cursor.
+    """
+    likes, ad_id = cursor
+    return f"{likes}_{ad_id}"
+
+
+def parse_top_cursor(text: str) -> Tuple[int, int]:
+    """
+    Parses a ranking cursor written by :func:`format_top_cursor`.
+    """
+    likes, ad_id = text.split("_")
+    return int(likes), int(ad_id)
+
+
+def top_cursor(ad: dict) -> Tuple[int, int]:
+    """
+    Returns the position of an ad in the ranking.
+    """
+    return ad.get("likes", 0), ad["id"]
+
+
+async def read_top_page(
+    cursor: Optional[Tuple[int, int]], backward: bool
+) -> List[dict]:
+    """
+    Returns up to ADS_PER_PAGE + 1 ranked ads next to a cursor.
+    """
+    return await get_top_ads(cursor, ADS_PER_PAGE + 1, backward)
+
+
+async def show_top_page(
+    message: Message,
+    page: int = 1,
+    user_id: int = None,
+    cursor: Optional[Tuple[int, int]] = None,
+    backward: bool = False,
+) -> None:
+    """
+    Shows a page of the advertisements ranked by likes. The ad numbers are
+    their ranks.
+    """
+    total_ads = await count_ads()
+
+    if not total_ads:
+        await message.answer(
+            "🏆 <b>No Advertisements Found</b>\n\n"
+            "There are no advertisements to rank yet. Be the first to create one!",
+            reply_markup=get_main_menu_keyboard(),
+        )
+        return
+
+    total_pages = ceil(total_ads / ADS_PER_PAGE)
+    page_ads, prev_cursor, next_cursor, page = await fetch_page(
+        read_top_page, cursor, backward, page, total_pages, cursor_of=top_cursor
+    )
+
+    await send_ads_page(
+        message,
+        "🏆 <b>Top Advertisements</b>",
+        page_ads,
+        page,
+        total_pages,
+        total_ads,
+        user_id or message.from_user.id,
+        format_top_cursor(prev_cursor) if prev_cursor is not None else None,
+        format_top_cursor(next_cursor) if next_cursor is not None else None,
+        prefix="top_page",
+    )
+
+
+@router.callback_query(F.data.startswith("top_page:"))
+async def top_page_navigation_callback(callback: CallbackQuery) -> None:
+    """
+    Handles page navigation button press in the ranking.
+    """
+    cursor, backward, page = parse_page_callback(callback.data, parse_top_cursor)
+
+    await callback.message.edit_text("Loading...")
+    await show_top_page(
+        callback.message,
+        page=page,
+        user_id=callback.from_user.id,
+        cursor=cursor,
+        backward=backward,
+    )
+    await callback.answer()
@@ -1,14 +1,29 @@
 import asyncio
+import logging
+import multiprocessing
+import secrets
+import signal
 from os import getenv
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 from middlewares import include_middlewares
+from middlewares.logging import middleware as access_log
+from middlewares.ordering import ChatOrderingMiddleware
 from handlers import include_routers
+import handlers.list as list_handlers
 from utils.set_commands import set_commands
 from utils.logger import get_logger
+from utils.storage import configure_storage, get_repository, search_index
+from utils.storage import aio as storage_aio
+from utils.storage.write_behind import WriteBehindBuffer
+from utils.send_scheduler import SendScheduler
+from utils.page_cache import page_cache
+from utils.fsm_storage import SqliteStorage
+from utils.webhook import create_ingress_app, create_webhook_app, serve
+from utils.workers import WorkerPool, poll_updates, run_worker
+from utils.inline_cache import inline_cache
 
 # Load environment variables
 load_dotenv()
@@ -18,10 +33,114 @@ logger = get_logger(__name__)
 if not TOKEN:
     raise ValueError("BOT_TOKEN is not set in environment variables.")
 
-# Initialize dispatcher with FSM storage
-storage = MemoryStorage()
+# Number of worker processes handling updates behind one ingress process;
+# 0 or 1 handles them in this process
+WORKERS = int(getenv("WORKERS", "0"))
+# True in the worker processes spawned by the ingress
+IS_WORKER = multiprocessing.parent_process() is not None
+# Index of this worker process, set by worker_main()
+WORKER_INDEX = 0
+
+# Select how advertisements are persisted
+STORAGE_MODE = getenv("STORAGE_MODE", "json")
+storage_options = {}
+if WORKERS > 1:
+    # Only SQLite can be written by several processes
+    if STORAGE_MODE != "sqlite":
+        raise ValueError("WORKERS requires STORAGE_MODE=sqlite")
+    storage_options["shared"] = True
+if STORAGE_MODE == "journal":
+    storage_options["compact_bytes"] = int(
+        getenv("JOURNAL_COMPACT_BYTES", str(1024 * 1024))
+    )
+SNAPSHOT_FORMAT = getenv("SNAPSHOT_FORMAT", "json")
+configure_storage(STORAGE_MODE, snapshot_format=SNAPSHOT_FORMAT, **storage_options)
+# Drop cached /list and /my pages whenever the ads they show change
+get_repository().mutation_listeners.append(page_cache.on_mutation)
+# Likewise for cached inline query answers
+get_repository().mutation_listeners.append(inline_cache.on_mutation)
+
+# Optional group commit of storage mutations
+WRITE_BEHIND = getenv("WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+if WRITE_BEHIND and WORKERS > 1:
+    # Its open transaction would lock the database for the other workers
+    raise ValueError("WRITE_BEHIND cannot be combined with WORKERS")
+write_behind = (
+    WriteBehindBuffer(
+        get_repository(),
+        interval=float(getenv("WRITE_BEHIND_INTERVAL", "1.0")),
+        max_batch=int(getenv("WRITE_BEHIND_MAX_BATCH", "100")),
+    )
+    if WRITE_BEHIND
+    else None
+)
+
+# Pacing of outgoing Bot API requests (messages per second); workers share
+# the global rate
+send_scheduler = SendScheduler(
+    global_rate=float(getenv("SEND_GLOBAL_RATE", "25")) / max(WORKERS, 1),
+    chat_rate=float(getenv("SEND_CHAT_RATE", "1")),
+    group_rate=float(getenv("SEND_GROUP_RATE", str(20 / 60))),
+)
+
+# "polling" asks Telegram for updates, "webhook" serves an aiohttp app they
+# are posted to
+RUN_MODE = getenv("RUN_MODE", "polling")
+# Public base URL registered with Telegram; leave unset to only serve
+# locally, e.g. to post recorded updates to the server by hand
+WEBHOOK_URL = getenv("WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_PATH = getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_PORT = int(getenv("WEBHOOK_PORT", "8080"))
+# A registered webhook always gets a secret, generated unless configured
+WEBHOOK_SECRET = getenv("WEBHOOK_SECRET") or (
+    secrets.token_urlsafe(32) if WEBHOOK_URL else None
+)
+# Without a secret anyone who reaches the server can post forged updates,
+# so it only listens on the loopback interface
+WEBHOOK_HOST = getenv("WEBHOOK_HOST") or ("0.0.0.0" if WEBHOOK_SECRET else "127.0.0.1")
+if (
+    RUN_MODE == "webhook"
+    and not WEBHOOK_SECRET
+    and WEBHOOK_HOST not in ("127.0.0.1", "::1", "localhost")
+):
+    raise ValueError("WEBHOOK_HOST other than localhost requires WEBHOOK_SECRET")
+WEBHOOK_MAX_BODY_BYTES = int(getenv("WEBHOOK_MAX_BODY_BYTES", str(256 * 1024)))
+WEBHOOK_MAX_CONCURRENCY = int(getenv("WEBHOOK_MAX_CONCURRENCY", "100"))
+WEBHOOK_MAX_CONNECTIONS = int(getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+if RUN_MODE not in ("polling", "webhook"):
+    raise ValueError(f"Unknown RUN_MODE: {RUN_MODE}")
+
+# Initialize dispatcher with FSM storage; drafts survive restarts and are
+# discarded when left untouched for FSM_DRAFT_TTL seconds
+storage = SqliteStorage(
+    ttl=float(getenv("FSM_DRAFT_TTL", str(24 * 60 * 60))),
+    max_cached=int(getenv("FSM_CACHE_SIZE", "1024")),
+)
 dp = Dispatcher(storage=storage)
 
+# Updates of a chat are handled in order, at most UPDATES_MAX_IN_FLIGHT at a
+# time overall; at most UPDATES_MAX_PENDING are accepted before polling waits
+update_ordering = ChatOrderingMiddleware(
+    max_in_flight=int(getenv("UPDATES_MAX_IN_FLIGHT", "100"))
+)
+UPDATES_MAX_PENDING = int(getenv("UPDATES_MAX_PENDING", "1000"))
+update_ordering.install(dp)
+
+# Access log of incoming messages: a sampled share, at a configurable level
+access_log.sample_rate = float(getenv("ACCESS_LOG_SAMPLE_RATE", "1"))
+ACCESS_LOG_LEVEL = getenv("ACCESS_LOG_LEVEL", "INFO").upper()
+if not isinstance(logging.getLevelName(ACCESS_LOG_LEVEL), int):
+    raise ValueError(f"Unknown ACCESS_LOG_LEVEL {ACCESS_LOG_LEVEL}")
+access_log.level = logging.getLevelName(ACCESS_LOG_LEVEL)
+
+# /list, /my, /top and /search send runs of photo ads as albums
+PAGE_GROUP_PHOTOS = getenv("PAGE_GROUP_PHOTOS", "false").lower() in ("1", "true", "yes")
+list_handlers.GROUP_PHOTOS = PAGE_GROUP_PHOTOS
+# /list and /my show one ad per message and move through them by editing it
+CAROUSEL = getenv("CAROUSEL", "false").lower() in ("1", "true", "yes")
+list_handlers.CAROUSEL = CAROUSEL
+
 # Include all routers and middlewares
 include_routers(dp)
 include_middlewares(dp)
@@ -30,17 +149,143 @@ include_middlewares(dp)
 async def on_startup(bot: Bot) -> None:
     """Actions to perform on bot startup."""
     logger.info("Bot is starting up...")
+    get_repository().load()
+    search_index.load()
+    await storage.start()
+    if write_behind is not None:
+        write_behind.start()
+    # With workers the ingress registers the bot
+    if not IS_WORKER:
+        await register_bot(bot)
+
+    logger.info("Bot started successfully.")
+
+
+async def register_bot(bot: Bot) -> None:
+    """Registers the webhook and the bot commands with Telegram."""
+    if RUN_MODE == "webhook" and WEBHOOK_URL:
+        await bot.set_webhook(
+            f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info(f"Webhook set to {WEBHOOK_URL}{WEBHOOK_PATH}")
     await set_commands(bot)
     # commands = await bot.get_my_commands()
     # logger.info(f"Bot commands: {commands}")
     logger.info("Bot commands set successfully.")
 
-    logger.info("Bot started successfully.")
-
 
 async def on_shutdown(bot: Bot) -> None:
     """Actions to perform on bot shutdown."""
     logger.info("Bot is shutting down...")
+    if write_behind is not None:
+        await write_behind.stop()
+    storage_aio.shutdown()
+    if write_behind is not None:
+        # Final synchronous flush of everything already acknowledged to users
+        write_behind.flush()
+        logger.info(
+            f"Write-behind wrote {write_behind.flushed_mutations} mutations "
+            f"in {write_behind.flushes} flushes"
+        )
+    # Workers share ads.index, so only the first one writes it; anything it
+    # misses is reconciled with the database on the next start
+    if WORKER_INDEX == 0:
+        search_index.save()
+    get_repository().close()
+    logger.info(
+        f"Send scheduler: {send_scheduler.retries} flood-control retries, "
+        f"peak queue depth {send_scheduler.max_queue_depth}"
+    )
+    logger.info(f"Page cache: {page_cache.hits} hits, {page_cache.misses} misses")
+    logger.info(f"Inline cache: {inline_cache.hits} hits, {inline_cache.misses} misses")
+    logger.info(
+        f"Updates: peak {update_ordering.max_in_flight_seen} in flight, "
+        f"peak chat queue depth {update_ordering.max_queue_depth}"
+    )
+    logger.info(
+        f"FSM storage: {storage.hits} hits, {storage.misses} misses, "
+        f"{storage.expired} drafts expired"
+    )
+
+
+def create_bot() -> Bot:
+    """Creates the bot with paced outgoing requests."""
+    bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot.session.middleware(send_scheduler)
+    return bot
+
+
+def worker_main(index: int, queue: multiprocessing.Queue) -> None:
+    """Entry point of a worker process."""
+    global WORKER_INDEX
+    WORKER_INDEX = index
+    # Ctrl+C reaches the whole process group; the ingress stops the workers
+    # once they have handled what was dispatched to them
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(run_worker_process(index, queue))
+
+
+async def run_worker_process(index: int, queue: multiprocessing.Queue) -> None:
+    """Handles the updates the ingress dispatches to one worker."""
+    bot = create_bot()
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    try:
+        handled = await run_worker(dp, bot, queue, max_pending=UPDATES_MAX_PENDING)
+        logger.info(f"Worker {index} handled {handled} updates")
+    finally:
+        await bot.session.close()
+
+
+async def run_ingress(bot: Bot) -> None:
+    """Receives updates and fans them out to the worker processes."""
+    # At most UPDATES_MAX_PENDING updates wait for each worker before
+    # receiving more waits
+    pool = WorkerPool(WORKERS, worker_main, max_queued=UPDATES_MAX_PENDING)
+    pool.start()
+    try:
+        await register_bot(bot)
+        if RUN_MODE == "webhook":
+            app = create_ingress_app(
+                pool.submit,
+                path=WEBHOOK_PATH,
+                secret_token=WEBHOOK_SECRET,
+                max_body_bytes=WEBHOOK_MAX_BODY_BYTES,
+            )
+            # Returns on SIGTERM or SIGINT
+            await serve(app, WEBHOOK_HOST, WEBHOOK_PORT)
+        else:
+            # Telegram refuses getUpdates while a webhook is set
+            await bot.delete_webhook()
+            stopped = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            signals = []
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                try:
+                    loop.add_signal_handler(signum, stopped.set)
+                    signals.append(signum)
+                except NotImplementedError:
+                    # Not supported on Windows
+                    pass
+            try:
+                await poll_updates(
+                    bot,
+                    pool.submit,
+                    allowed_updates=dp.resolve_used_update_types(),
+                    stopped=stopped,
+                )
+            finally:
+                for signum in signals:
+                    loop.remove_signal_handler(signum)
+            logger.info("Stop signal received, stopping the workers")
+    finally:
+        # The workers handle what was dispatched to them, run their shutdown
+        # hooks and exit
+        pool.stop()
+        await bot.session.close()
 
 
 async def main() -> None:
@@ -48,12 +293,28 @@ async def main() -> None:
     if not TOKEN:
         raise ValueError("BOT_TOKEN is not set in environment variables.")
 
-    bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot = create_bot()
+    if WORKERS > 1:
+        await run_ingress(bot)
+        return
 
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
 
-    await dp.start_polling(bot)
+    if RUN_MODE == "webhook":
+        app = create_webhook_app(
+            dp,
+            bot,
+            path=WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET,
+            max_body_bytes=WEBHOOK_MAX_BODY_BYTES,
+            max_concurrency=WEBHOOK_MAX_CONCURRENCY,
+        )
+        await serve(app, WEBHOOK_HOST, WEBHOOK_PORT)
+    else:
+        # Telegram refuses getUpdates while a webhook is set
+        await bot.delete_webhook()
+        await dp.start_polling(bot, tasks_concurrency_limit=UPDATES_MAX_PENDING)
 
 
 if __name__ == "__main__":
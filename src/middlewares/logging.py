@@ -1,13 +1,39 @@
 # middlewares/logging.py
+import logging
+import random
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Share of updates written to the access log
+ACCESS_LOG_SAMPLE_RATE = 1.0
+ACCESS_LOG_LEVEL = logging.INFO
+
 
 class LoggingMiddleware(BaseMiddleware):
+    """
+    Logs incoming messages at ``level``, for a ``sample_rate`` share of them.
+
+    Nothing is built for updates that are not logged, either because they
+    were not sampled or because the logger is not enabled for ``level``.
+    """
+
+    def __init__(
+        self, sample_rate: float = ACCESS_LOG_SAMPLE_RATE, level: int = ACCESS_LOG_LEVEL
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.level = level
+
     async def __call__(self, handler, event: TelegramObject, data: dict):
+        if logger.isEnabledFor(self.level) and (
+            self.sample_rate >= 1 or random.random() < self.sample_rate
+        ):
+            self.log(event)
+        return await handler(event, data)
+
+    def log(self, event: TelegramObject) -> None:
         user_name = "unknown"
         user_id = "unknown"
         command = None
@@ -36,12 +62,11 @@ class LoggingMiddleware(BaseMiddleware):
                     else message.text
                 )
 
-            logger.info(
+            logger.log(
+                self.level,
                 f"Incoming {event_type} | command={command} | user={user_name} (id={user_id})"
-                + (f" | text={text_preview}" if text_preview else "")
+                + (f" | text={text_preview}" if text_preview else ""),
             )
 
-        return await handler(event, data)
-
 
 middleware = LoggingMiddleware()
@@ -0,0 +1,114 @@
+# middlewares/ordering.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Updates handled at the same time across all chats
+MAX_IN_FLIGHT = 100
+
+
+class ChatOrderingMiddleware(BaseMiddleware):
+    """
+    Handles the updates of a chat strictly one after another, in the order
+    they arrived, and those of different chats in parallel.
+
+    Every chat has a queue of waiting updates, implemented by a lock that
+    wakes its waiters in order, and a depth counting the queued and running
+    updates. Only the update at the head of a chat's queue competes for
+    one of ``max_in_flight`` global slots, so a busy chat cannot occupy
+    slots it would leave idle. Updates without a chat, such as inline
+    queries, are ordered per user.
+
+    Install it with :meth:`install`, which queues every update before the
+    dispatcher's FSM middleware reads the chat's state, so an update is
+    filtered against the state its predecessors left.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT) -> None:
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.max_in_flight_seen = 0
+        self.max_queue_depth = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+        # chat -> [lock, queued and running updates]
+        self._queues: Dict[Hashable, List[Any]] = {}
+
+    def install(self, dispatcher: Dispatcher) -> None:
+        """
+        Registers the middleware as an outer update middleware of a
+        dispatcher, right before its FSM middleware.
+
+        The chat is known once aiogram's user context middleware has run,
+        and nothing else awaits before an update has its place in its queue.
+        """
+        outer = dispatcher.update.outer_middleware
+        fsm = dispatcher.fsm if dispatcher.fsm in outer else None
+        if fsm is not None:
+            outer.unregister(fsm)
+        outer(self)
+        if fsm is not None:
+            outer(fsm)
+
+    def queue_depth(self, chat_id: Hashable) -> int:
+        """
+        Returns the number of queued and running updates of a chat.
+        """
+        queue = self._queues.get(chat_id)
+        return queue[1] if queue is not None else 0
+
+    def queue_depths(self) -> Dict[Hashable, int]:
+        """
+        Returns the queue depth of every chat with pending updates.
+        """
+        return {chat_id: queue[1] for chat_id, queue in self._queues.items()}
+
+    @staticmethod
+    def _queue_key(data: Dict[str, Any]) -> Optional[Hashable]:
+        chat = data.get("event_chat")
+        if chat is not None:
+            return chat.id
+        user = data.get("event_from_user")
+        if user is not None:
+            return ("user", user.id)
+        return None
+
+    async def _run(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with self._slots:
+            self.in_flight += 1
+            self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+            try:
+                return await handler(event, data)
+            finally:
+                self.in_flight -= 1
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        key = self._queue_key(data)
+        if key is None:
+            return await self._run(handler, event, data)
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = [asyncio.Lock(), 0]
+        queue[1] += 1
+        self.max_queue_depth = max(self.max_queue_depth, queue[1])
+        try:
+            async with queue[0]:
+                return await self._run(handler, event, data)
+        finally:
+            queue[1] -= 1
+            if not queue[1]:
+                del self._queues[key]
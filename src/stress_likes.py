@@ -0,0 +1,144 @@
+# stress_likes.py
+"""
+Checks that no like is lost or counted twice under concurrency.
+
+For every storage mode, with write-behind off and on, thousands of
+``like_ad`` calls from distinct users are fired at once through the
+storage executor, each user also repeating some likes. After the
+storage is closed and reopened, every ad must have
+``likes == len(liked_by) ==`` the number of distinct users that liked it.
+
+Usage:
+    python3 src/stress_likes.py --likes 5000 --ads 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set, Tuple
+
+MODES = ["json", "journal", "sqlite"]
+
+
+def likers_by_ad(repository) -> Dict[int, Tuple[int, int]]:
+    """
+    Returns ad ID -> (stored like count, number of stored likers).
+    """
+    from utils.storage.sqlite_repository import SqliteAdRepository
+
+    counts = {ad["id"]: ad["likes"] for ad in repository.all()}
+    if isinstance(repository, SqliteAdRepository):
+        rows = repository._execute("SELECT ad_id, COUNT(*) FROM likes GROUP BY ad_id")
+        likers = {ad_id: count for ad_id, count in rows}
+    else:
+        snapshot = repository._snapshot()
+        likers = {ad["id"]: len(ad.get("liked_by", ())) for ad in snapshot["ads"]}
+    return {ad_id: (likes, likers.get(ad_id, 0)) for ad_id, likes in counts.items()}
+
+
+async def fire_likes(
+    ad_ids: List[int], likes: int, repeats: float, seed: int
+) -> Dict[int, Set[int]]:
+    """
+    Likes random ads from distinct users all at once and returns
+    ad ID -> users whose like was accepted.
+    """
+    from utils.storage import aio
+
+    rng = random.Random(seed)
+    calls = [(rng.choice(ad_ids), user_id) for user_id in range(1, likes + 1)]
+    # Some users like the same ad again, which must be refused
+    calls += rng.sample(calls, int(len(calls) * repeats))
+    rng.shuffle(calls)
+
+    results = await asyncio.gather(
+        *(aio.like_ad(ad_id, user_id) for ad_id, user_id in calls)
+    )
+    accepted: Dict[int, Set[int]] = {ad_id: set() for ad_id in ad_ids}
+    for (ad_id, user_id), (success, _, _) in zip(calls, results):
+        if success:
+            if user_id in accepted[ad_id]:
+                raise AssertionError(f"User {user_id} liked ad {ad_id} twice")
+            accepted[ad_id].add(user_id)
+    return accepted
+
+
+async def run_round(
+    mode: str, write_behind: bool, ads: int, likes: int, repeats: float
+) -> float:
+    from utils import storage
+    from utils.storage.write_behind import WriteBehindBuffer
+
+    os.chdir(tempfile.mkdtemp(prefix=f"stress-{mode}-"))
+    repository = storage.configure_storage(mode)
+    repository.load()
+    for index in range(ads):
+        storage.add_ad(index + 1, "text", content=f"ad {index}")
+    ad_ids = [ad["id"] for ad in repository.all()]
+
+    buffer = None
+    if write_behind:
+        buffer = WriteBehindBuffer(repository, interval=0.05, max_batch=100)
+        buffer.start()
+
+    start = time.perf_counter()
+    accepted = await fire_likes(ad_ids, likes, repeats, seed=len(ad_ids))
+    elapsed = time.perf_counter() - start
+
+    if buffer is not None:
+        await buffer.stop()
+        buffer.flush()
+    repository.close()
+
+    # Reopen from disk, so only what was written counts
+    reopened = storage.configure_storage(mode)
+    reopened.load()
+    stored = likers_by_ad(reopened)
+    for ad_id in ad_ids:
+        expected = len(accepted[ad_id])
+        if stored[ad_id] != (expected, expected):
+            likes_count, likers = stored[ad_id]
+            raise AssertionError(
+                f"{mode}: ad {ad_id} has likes={likes_count}, "
+                f"{likers} likers, {expected} users liked it"
+            )
+    total = sum(len(users) for users in accepted.values())
+    if total != likes:
+        raise AssertionError(f"{mode}: {total} of {likes} likes accepted")
+    reopened.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--likes", type=int, default=5000)
+    parser.add_argument("--ads", type=int, default=20)
+    parser.add_argument(
+        "--repeats", type=float, default=0.2, help="share of likes sent twice"
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import logging
+
+    logging.disable(logging.CRITICAL)
+
+    for mode in args.modes.split(","):
+        for write_behind in (False, True):
+            elapsed = asyncio.run(
+                run_round(mode, write_behind, args.ads, args.likes, args.repeats)
+            )
+            label = "write-behind" if write_behind else "write-through"
+            print(
+                f"{mode:8} {label:13} {args.likes} likes on {args.ads} ads: "
+                f"none lost ({elapsed:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# utils/fsm_storage.py
+import asyncio
+import json
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    StateType,
+    StorageKey,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+FSM_DB_FILE = "fsm.db"
+# Drafts untouched for this many seconds are discarded
+DRAFT_TTL = 24 * 60 * 60
+SWEEP_INTERVAL = 10 * 60
+# Users whose state is kept in memory
+MAX_CACHED_KEYS = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fsm (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fsm_updated ON fsm (updated);
+"""
+
+# (state, data, time of the last change or None for a user without a draft)
+Record = Tuple[Optional[str], Dict[str, Any], Optional[float]]
+EMPTY_RECORD: Record = (None, {}, None)
+
+
+class SqliteStorage(BaseStorage):
+    """
+    FSM storage that keeps the states and data of users in SQLite.
+
+    Reads are served by an LRU cache of the ``max_cached`` most recently
+    used keys, which also remembers users without any draft, so the state
+    filters checked on every message rarely reach the database. Writes go
+    to the cache and through to the database, where a user with an empty
+    state and data has no row at all; clearing such a user writes nothing.
+
+    A draft left untouched for ``ttl`` seconds is expired: it reads as
+    empty, and a background task started by :meth:`start` deletes the
+    expired rows every ``sweep_interval`` seconds. Memory therefore holds
+    at most ``max_cached`` users and the database only the drafts of the
+    last ``ttl`` seconds.
+
+    The database is accessed from one worker thread, which also keeps the
+    writes of a key in the order they were made.
+    """
+
+    def __init__(
+        self,
+        path: str = FSM_DB_FILE,
+        ttl: float = DRAFT_TTL,
+        sweep_interval: float = SWEEP_INTERVAL,
+        max_cached: int = MAX_CACHED_KEYS,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.max_cached = max_cached
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fsm")
+        self._key_builder = DefaultKeyBuilder(
+            with_bot_id=True, with_business_connection_id=True, with_destiny=True
+        )
+        self._cache: OrderedDict[str, Record] = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Drafts may be lost on power failure, but not on a crash
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _read_row(self, key: str) -> Optional[Tuple[Optional[str], str, float]]:
+        return (
+            self._open()
+            .execute("SELECT state, data, updated FROM fsm WHERE key = ?", (key,))
+            .fetchone()
+        )
+
+    def _write_row(
+        self, key: str, state: Optional[str], data: str, updated: float
+    ) -> None:
+        with self._open() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fsm (key, state, data, updated) "
+                "VALUES (?, ?, ?, ?)",
+                (key, state, data, updated),
+            )
+
+    def _delete_row(self, key: str) -> None:
+        with self._open() as conn:
+            conn.execute("DELETE FROM fsm WHERE key = ?", (key,))
+
+    def _delete_expired(self, cutoff: float) -> int:
+        with self._open() as conn:
+            return conn.execute("DELETE FROM fsm WHERE updated < ?", (cutoff,)).rowcount
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def start(self) -> None:
+        """
+        Opens the database and starts the sweeper. Must be called from the
+        running event loop.
+        """
+        count = await self._run(
+            lambda: self._open().execute("SELECT COUNT(*) FROM fsm").fetchone()[0]
+        )
+        self._sweeper = asyncio.create_task(self._sweep_forever())
+        logger.info(f"Opened FSM storage {self.path} with {count} drafts")
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Error sweeping FSM storage: {e}")
+
+    async def sweep(self) -> int:
+        """
+        Deletes the expired drafts.
+
+        Returns:
+            int: Number of drafts deleted from the database
+        """
+        cutoff = time() - self.ttl
+        for key, (_, _, updated) in list(self._cache.items()):
+            if updated is not None and updated < cutoff:
+                del self._cache[key]
+        removed = await self._run(self._delete_expired, cutoff)
+        if removed:
+            self.expired += removed
+            logger.info(f"Expired {removed} abandoned drafts")
+        return removed
+
+    def _remember(self, key: str, record: Record) -> None:
+        self._cache[key] = record
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def _is_expired(self, record: Record) -> bool:
+        updated = record[2]
+        return updated is not None and updated < time() - self.ttl
+
+    async def _get(self, key: StorageKey) -> Record:
+        db_key = self._key_builder.build(key)
+        record = self._cache.get(db_key)
+        if record is not None:
+            self.hits += 1
+            self._cache.move_to_end(db_key)
+        else:
+            self.misses += 1
+            row = await self._run(self._read_row, db_key)
+            # A write made while the row was read is newer than the row
+            record = self._cache.get(db_key)
+            if record is None:
+                record = EMPTY_RECORD
+                if row is not None:
+                    record = (row[0], json.loads(row[1]), row[2])
+                self._remember(db_key, record)
+
+        if self._is_expired(record):
+            self._cache[db_key] = record = EMPTY_RECORD
+            await self._run(self._delete_row, db_key)
+        return record
+
+    async def _put(
+        self, key: StorageKey, state: Optional[str], data: Dict[str, Any]
+    ) -> None:
+        db_key = self._key_builder.build(key)
+        if state is None and not data:
+            # Menu buttons clear the state of users that have none
+            if self._cache.get(db_key) is EMPTY_RECORD:
+                self._cache.move_to_end(db_key)
+                return
+            self._remember(db_key, EMPTY_RECORD)
+            await self._run(self._delete_row, db_key)
+        else:
+            updated = time()
+            self._remember(db_key, (state, data, updated))
+            await self._run(self._write_row, db_key, state, json.dumps(data), updated)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        _, data, _ = await self._get(key)
+        await self._put(key, state, data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._get(key))[0]
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise DataNotDictLikeError(
+                f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            )
+        state, _, _ = await self._get(key)
+        await self._put(key, state, data.copy())
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._get(key))[1].copy()
+
+    async def close(self) -> None:
+        """
+        Stops the sweeper and closes the database. The dispatcher calls
+        this on shutdown.
+        """
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,79 @@
+# utils/inline_cache.py
+from typing import Any, List, Optional, Tuple
+from utils.range_cache import NO_LOWER, NO_UPPER, RangeCache
+
+# (normalized query, ID of the last ad of the previous page or None)
+InlineKey = Tuple[str, Optional[int]]
+
+MAX_INLINE_PAGES = 1024
+MAX_INLINE_RESULTS = 4096
+
+
+class InlineCache(RangeCache):
+    """
+    Caches answers to inline queries and the inline results of single ads.
+
+    Inline queries arrive on every keystroke, so each answered page is kept
+    under (query, offset) and the same typing sequence, or the same query
+    from another user, is answered without touching storage. Pages list ads
+    newest first and continue below the ID in the offset, so an add only
+    drops the pages whose range reaches past the newest ad, i.e. the first
+    pages.
+
+    Results are built per ad and shared by all pages and queries showing
+    that ad. They are stored with the like count they show, the only part
+    of an ad that changes, and dropped with their ad.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = MAX_INLINE_PAGES,
+        max_results: int = MAX_INLINE_RESULTS,
+    ) -> None:
+        super().__init__(max_pages, max_results)
+
+    def get_page(self, key: InlineKey) -> Optional[Tuple[List[Any], str]]:
+        """
+        Returns the cached results and next offset of a page or None.
+        """
+        return self._get_page(key)
+
+    def put_page(
+        self,
+        key: InlineKey,
+        results: List[Any],
+        next_offset: str,
+        ad_ids: List[int],
+        version: int,
+    ) -> None:
+        """
+        Stores a page of results for ``ad_ids`` (newest first) when no
+        mutation was reported since ``version`` was taken. An empty
+        ``next_offset`` marks the last page.
+        """
+        _, cursor = key
+        high = NO_UPPER if cursor is None else cursor - 1
+        low = ad_ids[-1] if next_offset and ad_ids else NO_LOWER
+        self._put_page(key, (results, next_offset), ad_ids, low, high, version)
+
+    def get_result(self, ad_id: int, likes: int) -> Any:
+        """
+        Returns the inline result of an ad built for a like count or None.
+        """
+        with self._lock:
+            entry = self._get_ad_entry(ad_id)
+            if entry is None or entry[0] != likes:
+                return None
+            return entry[1]
+
+    def put_result(self, ad_id: int, likes: int, result: Any) -> Any:
+        """
+        Stores the inline result of an ad built for a like count and
+        returns it.
+        """
+        with self._lock:
+            self._put_ad_entry(ad_id, (likes, result))
+        return result
+
+
+inline_cache = InlineCache()
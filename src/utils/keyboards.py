@@ -1,11 +1,23 @@
+import logging
+from functools import cache, lru_cache
+from typing import Optional, List, Tuple, Union
 from aiogram.types import (
     ReplyKeyboardMarkup,
     KeyboardButton,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
 )
+from utils.logger import get_logger
 
+logger = get_logger(__name__)
 
+# Action keyboards of this many (ad, owner) pairs are kept for reuse
+AD_KEYBOARD_CACHE_SIZE = 4096
+
+# Keyboards are shared between messages, so callers must not modify them
+
+
+@cache
 def get_main_menu_keyboard() -> InlineKeyboardMarkup:
     keyboard = [
         [
@@ -14,11 +26,13 @@ def get_main_menu_keyboard() -> InlineKeyboardMarkup:
             )
         ],
         [InlineKeyboardButton(text="📋 List advertisements", callback_data="list_ads")],
+        [InlineKeyboardButton(text="🗂 My advertisements", callback_data="my_ads")],
         [InlineKeyboardButton(text="❓ Help", callback_data="help")],
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@cache
 def get_confirm_text_keyboard() -> InlineKeyboardMarkup:
     """
     Creates the keyboard for confirming text.
@@ -38,6 +52,7 @@ def get_confirm_text_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@cache
 def get_photo_description_keyboard() -> InlineKeyboardMarkup:
     """
     Creates the keyboard for adding a photo description.
@@ -66,49 +81,81 @@ def get_ad_actions_keyboard(
     """
     Creates the keyboard for actions on an advertisement.
     """
-    from utils.logger import get_logger
+    is_owner = user_id == ad_owner_id
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"Keyboard for ad {ad_id}: user_id={user_id}, owner_id={ad_owner_id}, "
+            f"delete button: {is_owner}"
+        )
 
-    logger = get_logger(__name__)
+    return _ad_actions_keyboard(ad_id, is_owner)
 
-    logger.info(
-        f"Creating keyboard for ad {ad_id}: user_id={user_id}, owner_id={ad_owner_id}"
-    )
 
+@lru_cache(maxsize=AD_KEYBOARD_CACHE_SIZE)
+def _ad_actions_keyboard(ad_id: int, is_owner: bool) -> InlineKeyboardMarkup:
     keyboard = [[InlineKeyboardButton(text="❤️ Like", callback_data=f"like_ad:{ad_id}")]]
 
-    if user_id == ad_owner_id:
+    if is_owner:
         keyboard.append(
             [InlineKeyboardButton(text="🗑 Delete", callback_data=f"delete_ad:{ad_id}")]
         )
-        logger.info(f"Added delete button for owner {user_id}")
-    else:
-        logger.info(f"No delete button: user {user_id} != owner {ad_owner_id}")
+
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_ad_group_keyboard(numbered_ads: List[Tuple[int, int]]) -> InlineKeyboardMarkup:
+    """
+    Creates the keyboard with a like button per ad of a photo album.
+
+    Args:
+        numbered_ads: (ad number, ad ID) pairs in display order
+
+    Returns:
+        InlineKeyboardMarkup: The keyboard for liking the album's ads
+    """
+    buttons = [
+        InlineKeyboardButton(text=f"❤️ #{ad_number}", callback_data=f"like_ad:{ad_id}")
+        for ad_number, ad_id in numbered_ads
+    ]
+    # At most five buttons per row
+    keyboard = [buttons[i : i + 5] for i in range(0, len(buttons), 5)]
 
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
 def get_ads_navigation_keyboard(
-    current_page: int, total_pages: int
+    current_page: int,
+    total_pages: int,
+    prev_cursor: Optional[Union[int, str]] = None,
+    next_cursor: Optional[Union[int, str]] = None,
+    prefix: str = "page",
 ) -> InlineKeyboardMarkup:
     """
     Creates the keyboard for navigation between advertisement pages.
 
+    The buttons carry the ID of the first or last ad on the page as a
+    cursor, so pages do not shift when ads are added or deleted.
+
     Args:
         current_page: Current page
         total_pages: Total number of pages
+        prev_cursor: Cursor of the first ad on the page, None on the first page
+        next_cursor: Cursor of the last ad on the page, None on the last page
+        prefix: Callback data prefix of the page buttons
 
     Returns:
         InlineKeyboardMarkup: The keyboard for navigation
     """
     keyboard = []
 
-    if total_pages > 1:
+    if prev_cursor is not None or next_cursor is not None:
         nav_buttons = []
 
-        if current_page > 1:
+        if prev_cursor is not None:
             nav_buttons.append(
                 InlineKeyboardButton(
-                    text="⬅️ Back", callback_data=f"page:{current_page-1}"
+                    text="⬅️ Back",
+                    callback_data=f"{prefix}:prev:{prev_cursor}:{current_page-1}",
                 )
             )
 
@@ -118,10 +165,11 @@ def get_ads_navigation_keyboard(
             )
         )
 
-        if current_page < total_pages:
+        if next_cursor is not None:
             nav_buttons.append(
                 InlineKeyboardButton(
-                    text="Next ➡️", callback_data=f"page:{current_page+1}"
+                    text="Next ➡️",
+                    callback_data=f"{prefix}:next:{next_cursor}:{current_page+1}",
                 )
             )
 
@@ -132,3 +180,43 @@ def get_ads_navigation_keyboard(
     )
 
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_carousel_keyboard(
+    ad_id: int,
+    is_owner: bool,
+    ad_number: int,
+    total_ads: int,
+    prev_cursor: Optional[int] = None,
+    next_cursor: Optional[int] = None,
+    prefix: str = "carousel",
+) -> InlineKeyboardMarkup:
+    """
+    Creates the keyboard of the carousel message: actions on the shown
+    advertisement followed by the navigation between advertisements.
+
+    Args:
+        ad_id: ID of the shown advertisement
+        is_owner: Whether the viewer created the advertisement
+        ad_number: Number of the shown advertisement
+        total_ads: Total number of advertisements
+        prev_cursor: ID of the shown ad when an earlier one exists
+        next_cursor: ID of the shown ad when a later one exists
+        prefix: Callback data prefix of the navigation buttons
+
+    Returns:
+        InlineKeyboardMarkup: The keyboard for the carousel
+    """
+    actions = [InlineKeyboardButton(text="❤️ Like", callback_data=f"like_ad:{ad_id}")]
+    if is_owner:
+        actions.append(
+            InlineKeyboardButton(
+                text="🗑 Delete", callback_data=f"{prefix}_delete:{ad_id}:{ad_number}"
+            )
+        )
+
+    navigation = get_ads_navigation_keyboard(
+        ad_number, total_ads, prev_cursor, next_cursor, prefix
+    )
+
+    return InlineKeyboardMarkup(inline_keyboard=[actions, *navigation.inline_keyboard])
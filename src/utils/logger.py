@@ -1,5 +1,10 @@
+import atexit
 import logging
+import queue
 import sys
+import threading
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 LEVEL_EMOJI: dict[str, str] = {
@@ -21,55 +26,97 @@ LEVEL_COLOR: dict[str, str] = {
 RESET_COLOR = "\033[0m"
 
 
+@lru_cache(maxsize=None)
+def short_name(name: str) -> str:
+    """
+    Returns the last two parts of a logger name, padded or cut to 15 characters.
+    """
+    short = ".".join(name.split(".")[-2:])
+    return (short[:12] + "...") if len(short) > 15 else short.ljust(15)
+
+
 class FixedFormatter(logging.Formatter):
     def format(self, record) -> str:
         """
         Format the log record with emoji, shortened logger name, padded level name,
         and optional color for console output.
+
+        The record is left untouched, so other handlers format it unchanged.
         """
-        record.emoji = LEVEL_EMOJI.get(record.levelname, "")
-        parts = record.name.split(".")
-        short = ".".join(parts[-2:])
-        record.shortname = (short[:12] + "...") if len(short) > 15 else short.ljust(15)
-        record.levelname = f"{record.levelname:<8}"
-
-        color = LEVEL_COLOR.get(record.levelname.strip(), "")
-        record.msg = (
-            f"{color}{record.getMessage()}{RESET_COLOR}"
-            if color
-            else record.getMessage()
+        message = record.getMessage()
+        color = LEVEL_COLOR.get(record.levelname, "")
+        values = dict(
+            record.__dict__,
+            asctime=self.formatTime(record, self.datefmt),
+            emoji=LEVEL_EMOJI.get(record.levelname, ""),
+            shortname=short_name(record.name),
+            levelname=f"{record.levelname:<8}",
+            message=f"{color}{message}{RESET_COLOR}" if color else message,
         )
+        text = self._style._fmt % values
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        if record.stack_info:
+            text += "\n" + self.formatStack(record.stack_info)
+        return text
 
-        return super().format(record)
 
+class LazyQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
 
-def get_logger(
-    name: str = __name__, level: int = logging.INFO, log_file: Path | str | None = None
-) -> logging.Logger:
+    QueueHandler renders every record before queueing it, so that it can be
+    pickled. The queue never leaves the process, so only the arguments are
+    merged into the message, fixing the values they had when logged.
     """
-    Returns a logger with both console and optional file logging.
 
-    :param name: Logger name
-    :param level: Logging level
-    :param log_file: Optional path to log file
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class LoggerFilter(logging.Filter):
     """
-    logger = logging.getLogger(name)
-    if logger.hasHandlers():
-        return logger
+    Passes the records of the loggers in ``names``.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.names: set[str] = set()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.name in self.names
+
+
+_lock = threading.Lock()
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler = LazyQueueHandler(_queue)
+_listener: QueueListener | None = None
+# log file -> handler writing the records of the loggers given that file
+_file_handlers: dict[Path, logging.FileHandler] = {}
 
-    logger.setLevel(level)
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(
-        FixedFormatter(
-            "%(asctime)s | %(emoji)s %(levelname)s | %(shortname)s | %(message)s",
-            datefmt="%H:%M",
+def _start_listener() -> QueueListener:
+    global _listener
+    if _listener is None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(
+            FixedFormatter(
+                "%(asctime)s | %(emoji)s %(levelname)s | %(shortname)s | %(message)s",
+                datefmt="%H:%M",
+            )
         )
-    )
-    logger.addHandler(console_handler)
+        _listener = QueueListener(_queue, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    return _listener
+
 
-    if log_file:
-        log_file = Path(log_file)
+def _add_file_handler(listener: QueueListener, log_file: Path, name: str) -> None:
+    file_handler = _file_handlers.get(log_file)
+    if file_handler is None:
         log_file.parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setFormatter(
@@ -78,6 +125,56 @@ def get_logger(
                 datefmt="%Y-%m-%d %H:%M:%S",
             )
         )
-        logger.addHandler(file_handler)
+        file_handler.addFilter(LoggerFilter())
+        _file_handlers[log_file] = file_handler
+        # The listener thread reads the tuple anew for every record
+        listener.handlers = (*listener.handlers, file_handler)
+    file_handler.filters[0].names.add(name)
+
+
+def get_logger(
+    name: str = __name__, level: int = logging.INFO, log_file: Path | str | None = None
+) -> logging.Logger:
+    """
+    Returns a logger with both console and optional file logging.
+
+    Logging a record only puts it on a queue; one background thread formats
+    it and writes it to the console and the log files, so slow output never
+    blocks the caller.
+
+    :param name: Logger name
+    :param level: Logging level
+    :param log_file: Optional path to log file
+    """
+    logger = logging.getLogger(name)
+    if logger.hasHandlers():
+        return logger
+
+    with _lock:
+        listener = _start_listener()
+        logger.setLevel(level)
+        # Every logger gets its own handlers, so records must not reach parents
+        logger.propagate = False
+        logger.addHandler(_queue_handler)
+        if log_file:
+            _add_file_handler(listener, Path(log_file), name)
 
     return logger
+
+
+def stop_logging() -> None:
+    """
+    Writes out the queued records and stops the listener thread. Records
+    logged afterwards are written directly. Called on interpreter exit.
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        handlers, _listener = _listener.handlers, None
+        for logger in logging.Logger.manager.loggerDict.values():
+            if isinstance(logger, logging.Logger) and _queue_handler in logger.handlers:
+                logger.removeHandler(_queue_handler)
+                for handler in handlers:
+                    logger.addHandler(handler)
@@ -0,0 +1,72 @@
+# utils/page_cache.py
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from utils.range_cache import NO_LOWER, NO_UPPER, RangeCache
+
+# (user ID for /my or None for /list, cursor, backward)
+PageKey = Tuple[Optional[int], Optional[int], bool]
+
+MAX_PAGES = 256
+MAX_RENDERED_ADS = 2048
+
+
+class PageCache(RangeCache):
+    """
+    Caches fetched pages of ads and rendered ad messages.
+
+    A page is stored under (scope, cursor, backward); an add or a delete
+    only drops the pages of the /list scope and of the owner's /my scope.
+    Rendered messages are stored per ad and keyed by whatever they depend
+    on, so they are reused across pages and viewers and dropped with
+    their ad.
+    """
+
+    def __init__(
+        self, max_pages: int = MAX_PAGES, max_rendered_ads: int = MAX_RENDERED_ADS
+    ) -> None:
+        super().__init__(max_pages, max_rendered_ads)
+
+    def get_page(self, key: PageKey) -> Optional[List[dict]]:
+        """
+        Returns the cached ads of a page or None.
+        """
+        return self._get_page(key)
+
+    def put_page(self, key: PageKey, ads: List[dict], limit: int, version: int) -> None:
+        """
+        Stores a page read with ``limit`` when no mutation was reported
+        since ``version`` was taken.
+        """
+        _, cursor, backward = key
+        ad_ids = [ad["id"] for ad in ads]
+        # A short read reached the end of the list in its direction
+        if backward:
+            low = ad_ids[0] if len(ads) == limit else NO_LOWER
+            high = NO_UPPER if cursor is None else cursor - 1
+        else:
+            low = NO_LOWER if cursor is None else cursor + 1
+            high = ad_ids[-1] if len(ads) == limit else NO_UPPER
+        self._put_page(key, ads, ad_ids, low, high, version)
+
+    def get_rendered(self, ad_id: int, key: Hashable) -> Any:
+        """
+        Returns a rendered message of an ad or None.
+        """
+        with self._lock:
+            rendered = self._get_ad_entry(ad_id)
+            return rendered.get(key) if rendered is not None else None
+
+    def put_rendered(self, ad_id: int, key: Hashable, value: Any) -> Any:
+        """
+        Stores a rendered message of an ad and returns it.
+        """
+        with self._lock:
+            rendered: Dict[Hashable, Any] = self._get_ad_entry(ad_id) or {}
+            rendered[key] = value
+            self._put_ad_entry(ad_id, rendered)
+        return value
+
+    def _in_scope(self, key: PageKey, owner_id: Optional[int]) -> bool:
+        return key[0] in (None, owner_id)
+
+
+page_cache = PageCache()
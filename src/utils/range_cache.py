@@ -0,0 +1,137 @@
+# utils/range_cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+NO_LOWER = float("-inf")
+NO_UPPER = float("inf")
+
+
+class RangeCache:
+    """
+    Base of the caches of pages of ads read from storage.
+
+    Every page is stored with the IDs of the ads it shows and the range of
+    IDs it was read from, so each storage mutation drops exactly the pages
+    it can change: a like only the pages showing that ad, an add or a
+    delete only the pages of its scope (see :meth:`_in_scope`) whose range
+    contains the ID. Next to the pages, an entry built from a single ad can
+    be kept per ad; it is dropped with its ad.
+
+    Subclasses define the keys and what a page or an ad entry holds.
+    Storage reports mutations from its worker threads, hence the lock.
+    A page read while a mutation was reported is not stored, because it may
+    predate the mutation.
+    """
+
+    def __init__(self, max_pages: int, max_ad_entries: int) -> None:
+        self.max_pages = max_pages
+        self.max_ad_entries = max_ad_entries
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (page, ad IDs, lowest ID covered, highest ID covered)
+        self._pages: OrderedDict[Hashable, Tuple[Any, List[int], float, float]] = (
+            OrderedDict()
+        )
+        self._pages_by_ad: Dict[int, Set[Hashable]] = {}
+        self._ad_entries: OrderedDict[int, Any] = OrderedDict()
+
+    def _get_page(self, key: Hashable) -> Any:
+        """
+        Returns the cached page stored under ``key`` or None.
+        """
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put_page(
+        self,
+        key: Hashable,
+        page: Any,
+        ad_ids: List[int],
+        low: float,
+        high: float,
+        version: int,
+    ) -> None:
+        """
+        Stores a page showing ``ad_ids`` that was read from the IDs between
+        ``low`` and ``high``, when no mutation was reported since
+        ``version`` was taken.
+        """
+        with self._lock:
+            if version != self.version:
+                return
+            self._drop_page(key)
+            self._pages[key] = (page, ad_ids, low, high)
+            for ad_id in ad_ids:
+                self._pages_by_ad.setdefault(ad_id, set()).add(key)
+            while len(self._pages) > self.max_pages:
+                self._drop_page(next(iter(self._pages)))
+
+    def _drop_page(self, key: Hashable) -> None:
+        entry = self._pages.pop(key, None)
+        if entry is None:
+            return
+        for ad_id in entry[1]:
+            keys = self._pages_by_ad.get(ad_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._pages_by_ad[ad_id]
+
+    def _get_ad_entry(self, ad_id: int) -> Any:
+        """
+        Returns the entry of an ad or None. Called with the lock.
+        """
+        entry = self._ad_entries.get(ad_id)
+        if entry is not None:
+            self._ad_entries.move_to_end(ad_id)
+        return entry
+
+    def _put_ad_entry(self, ad_id: int, entry: Any) -> None:
+        """
+        Stores the entry of an ad. Called with the lock.
+        """
+        self._ad_entries[ad_id] = entry
+        self._ad_entries.move_to_end(ad_id)
+        while len(self._ad_entries) > self.max_ad_entries:
+            self._ad_entries.popitem(last=False)
+
+    def _in_scope(self, key: Hashable, owner_id: Optional[int]) -> bool:
+        """
+        Returns whether an ad of ``owner_id`` can appear on the pages
+        stored under ``key``.
+        """
+        return True
+
+    def on_mutation(
+        self, op: str, ad_id: Optional[int], owner_id: Optional[int]
+    ) -> None:
+        """
+        Storage mutation listener, see :class:`StorageBackend`.
+        """
+        with self._lock:
+            self.version += 1
+
+            if op == "replace":
+                self._pages.clear()
+                self._pages_by_ad.clear()
+                self._ad_entries.clear()
+                return
+
+            self._ad_entries.pop(ad_id, None)
+            stale = set(self._pages_by_ad.get(ad_id, ()))
+            if op in ("add", "delete"):
+                for key, (_, _, low, high) in self._pages.items():
+                    if low <= ad_id <= high and self._in_scope(key, owner_id):
+                        stale.add(key)
+
+            for key in stale:
+                self._drop_page(key)
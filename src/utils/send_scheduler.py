@@ -0,0 +1,181 @@
+# utils/send_scheduler.py
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import TYPE_CHECKING, Hashable, Optional
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = get_logger(__name__)
+
+# Telegram's documented limits: about 30 messages per second overall, one
+# per second in a private chat and 20 per minute in a group. A bucket lets
+# through its burst on top of its rate, so 25/s plus 5 keeps every second
+# within 30 messages.
+GLOBAL_RATE = 25.0
+GLOBAL_BURST = 5
+CHAT_RATE = 1.0
+GROUP_RATE = 20 / 60
+# Short bursts are tolerated in a chat, so a whole /list page goes out at once
+CHAT_BURST = 10
+GROUP_BURST = 5
+MAX_RETRIES = 3
+# Idle chat buckets are forgotten once this many are tracked
+MAX_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking.
+
+    Every :meth:`reserve` takes a token, possibly driving the balance below
+    zero, and returns how long the caller has to wait for it. Waiters are
+    therefore served in arrival order without any queue or lock. After a
+    flood-control error :meth:`block` stops the refill for a while.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        # Time of the last refill; lies in the future while blocked
+        self._updated = monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Takes a token and returns the seconds to wait before using it.
+        """
+        now = monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        delay = max(self._updated - now, 0.0)
+        if self._tokens < 0:
+            delay += -self._tokens / self.rate
+        return delay
+
+    def block(self, seconds: float) -> None:
+        """
+        Hands out no tokens for the next ``seconds``.
+        """
+        now = monotonic()
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+        self._updated = max(self._updated, now + seconds)
+
+    def blocked_for(self) -> float:
+        """Seconds until the bucket refills again."""
+        return max(self._updated - monotonic(), 0.0)
+
+    def is_idle(self) -> bool:
+        """Whether the bucket is full, i.e. no different from a new one."""
+        self._refill(monotonic())
+        return self._tokens >= self.capacity
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """
+    Session middleware that paces outgoing Bot API requests.
+
+    Every request addressed to a chat waits for a token from that chat's
+    bucket and then from the global bucket, so a backlog in one slow chat
+    does not hold up the others. A ``TelegramRetryAfter`` error blocks the
+    chat's bucket for the requested time and the request is retried up to
+    ``max_retries`` times. ``queue_depth`` is the number of requests
+    currently waiting for a token.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        chat_rate: float = CHAT_RATE,
+        group_rate: float = GROUP_RATE,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.retries = 0
+        self._global = TokenBucket(global_rate, GLOBAL_BURST)
+        self._chats: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+
+    def _chat_bucket(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Group and channel IDs are negative, usernames start with "@"
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = TokenBucket(self.chat_rate, CHAT_BURST)
+            else:
+                bucket = TokenBucket(self.group_rate, GROUP_BURST)
+            self._chats[chat_id] = bucket
+            self._forget_idle_chats()
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _forget_idle_chats(self) -> None:
+        # Least recently used buckets come first; stop at the first busy one
+        while len(self._chats) > MAX_CHAT_BUCKETS:
+            chat_id, bucket = next(iter(self._chats.items()))
+            if not bucket.is_idle():
+                break
+            del self._chats[chat_id]
+
+    @staticmethod
+    async def _wait(bucket: TokenBucket) -> None:
+        delay = bucket.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A flood-control error may have blocked the bucket meanwhile
+            delay = bucket.blocked_for()
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id: Optional[Hashable] = getattr(method, "chat_id", None)
+        if chat_id is None:
+            # Polling, callback answers and the like are not rate limited
+            return await make_request(bot, method)
+
+        chat_bucket = self._chat_bucket(chat_id)
+        attempt = 0
+        while True:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            try:
+                await self._wait(chat_bucket)
+                await self._wait(self._global)
+            finally:
+                self.queue_depth -= 1
+
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                chat_bucket.block(e.retry_after)
+                logger.warning(
+                    f"Flood control on {type(method).__name__} in chat {chat_id}, "
+                    f"retrying in {e.retry_after}s (attempt {attempt})"
+                )
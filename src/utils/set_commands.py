@@ -15,6 +15,9 @@ async def set_commands(bot: Bot) -> None:
         BotCommand(command="/help", description="❓ Get help and instructions"),
         BotCommand(command="/add", description="📝 Create a new advertisement"),
         BotCommand(command="/list", description="📋 Browse all advertisements"),
+        BotCommand(command="/my", description="🗂 Browse your advertisements"),
+        BotCommand(command="/top", description="🏆 Browse the most liked ads"),
+        BotCommand(command="/search", description="🔍 Search advertisements"),
     ]
 
     await bot.set_my_commands(commands)
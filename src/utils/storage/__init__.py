@@ -0,0 +1,328 @@
+# utils/storage/__init__.py
+import os
+from typing import List, Dict, Any, Optional, Tuple
+from utils.logger import get_logger
+from utils.storage.base import StorageBackend
+from utils.storage.json_repository import AdRepository, ADS_FILE
+from utils.storage.journal_repository import JournaledAdRepository, JOURNAL_FILE
+from utils.storage.sqlite_repository import SqliteAdRepository, DB_FILE
+from utils.storage.snapshot import BINARY_ADS_FILE
+from utils.storage.search_index import SearchIndex, SEARCH_INDEX_FILE
+
+logger = get_logger(__name__)
+
+repository: StorageBackend = AdRepository(ADS_FILE)
+search_index = SearchIndex(SEARCH_INDEX_FILE)
+search_index.attach(repository)
+
+
+def configure_storage(
+    mode: str = "json", snapshot_format: str = "json", **options: Any
+) -> StorageBackend:
+    """
+    Selects the storage mode used by the module-level functions.
+
+    Args:
+        mode: "json" to rewrite the whole file on every change,
+            "journal" to append changes to a journal,
+            "sqlite" to keep ads in an SQLite database
+        snapshot_format: Snapshot format of the json and journal modes,
+            "json" for ads.json or "binary" for ads.bin; an existing
+            ads.json is migrated to ads.bin automatically
+        **options: Extra keyword arguments for the backend
+
+    Returns:
+        StorageBackend: The active backend
+    """
+    global repository
+
+    if snapshot_format == "binary":
+        snapshot_options = dict(
+            path=BINARY_ADS_FILE, snapshot_format="binary", legacy_path=ADS_FILE
+        )
+    else:
+        snapshot_options = dict(path=ADS_FILE, snapshot_format=snapshot_format)
+
+    if mode == "json":
+        new_repository = AdRepository(**snapshot_options, **options)
+    elif mode == "journal":
+        new_repository = JournaledAdRepository(
+            journal_path=JOURNAL_FILE, **snapshot_options, **options
+        )
+    elif mode == "sqlite":
+        import_path = snapshot_options["path"]
+        if not os.path.exists(import_path):
+            import_path = ADS_FILE
+        new_repository = SqliteAdRepository(DB_FILE, import_path=import_path, **options)
+    else:
+        raise ValueError(f"Unknown storage mode: {mode}")
+
+    repository.close()
+    repository = new_repository
+    search_index.attach(repository)
+    logger.info(f"Using {mode} storage")
+    return repository
+
+
+def get_repository() -> StorageBackend:
+    """
+    Returns the active advertisement storage backend.
+    """
+    return repository
+
+
+def load_ads() -> List[Dict[str, Any]]:
+    """
+    Returns all advertisements from the active storage.
+
+    Returns:
+        List[Dict[str, Any]]: Loaded advertisements
+    """
+    return repository.all()
+
+
+def save_ads(ads: List[Dict[str, Any]]) -> bool:
+    """
+    Replaces all advertisements in the active storage.
+
+    Args:
+        ads: Advertisements list
+
+    Returns:
+        bool: True if the advertisements were saved successfully
+    """
+    return repository.replace(ads)
+
+
+def count_ads() -> int:
+    """
+    Returns the total number of advertisements.
+
+    Returns:
+        int: Number of advertisements
+    """
+    return repository.count()
+
+
+def get_ads_page(offset: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Returns a slice of advertisements in creation order.
+
+    Args:
+        offset: Number of advertisements to skip
+        limit: Maximum number of advertisements to return
+
+    Returns:
+        List[Dict[str, Any]]: Advertisements on the page
+    """
+    return repository.page(offset, limit)
+
+
+def seek_ads(
+    cursor: Optional[int], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Returns advertisements next to a cursor in creation order.
+
+    Args:
+        cursor: ID of the last seen advertisement, None to start at an end
+        limit: Maximum number of advertisements to return
+        backward: Return the advertisements before the cursor instead
+
+    Returns:
+        List[Dict[str, Any]]: Advertisements on the page
+    """
+    return repository.seek(cursor, limit, backward)
+
+
+def get_top_ads(
+    cursor: Optional[Tuple[int, int]], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Returns advertisements ranked by likes, most liked first.
+
+    Args:
+        cursor: (likes, id) of the last seen advertisement, None to start
+            at an end of the ranking
+        limit: Maximum number of advertisements to return
+        backward: Return the advertisements ranked above the cursor instead
+
+    Returns:
+        List[Dict[str, Any]]: Advertisements in ranking order
+    """
+    return repository.top(cursor, limit, backward)
+
+
+def search_ads(
+    query: str, cursor: Optional[int], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Returns advertisements whose text or caption contains words starting
+    with every term of the query, in creation order next to a cursor.
+
+    Args:
+        query: Search terms
+        cursor: ID of the last seen advertisement, None to start at an end
+        limit: Maximum number of advertisements to return
+        backward: Return the advertisements before the cursor instead
+
+    Returns:
+        List[Dict[str, Any]]: Matching advertisements
+    """
+    return search_index.seek(query, cursor, limit, backward)
+
+
+def count_search_results(query: str) -> int:
+    """
+    Returns the number of advertisements matching a query.
+
+    Args:
+        query: Search terms
+
+    Returns:
+        int: Number of matching advertisements
+    """
+    return search_index.count(query)
+
+
+def add_ad(
+    user_id: int, ad_type: str, content: str = "", file_id: str = "", caption: str = ""
+) -> bool:
+    """
+    Creates a new advertisement and adds it to the list.
+
+    Args:
+        user_id: User ID
+        ad_type: Advertisement type (text, photo, audio, voice)
+        content: Text content
+        file_id: File media ID
+        caption: Media description
+
+    Returns:
+        bool: True if the advertisement was added successfully
+    """
+    new_ad = {"user_id": user_id, "type": ad_type, "likes": 0}
+
+    if ad_type == "text":
+        new_ad["content"] = content
+    elif ad_type in ["photo", "audio", "voice"]:
+        new_ad["file_id"] = file_id
+        if caption:
+            new_ad["caption"] = caption
+
+    result = repository.add(new_ad)
+
+    if result:
+        logger.info(f"Added new {ad_type} ad for user {user_id}")
+
+    return result
+
+
+def get_user_ads(user_id: int) -> List[Dict[str, Any]]:
+    """
+    Returns a list of advertisements for a user.
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        List[Dict[str, Any]]: User's advertisements
+    """
+    user_ads = repository.user_ads(user_id)
+    logger.info(f"Found {len(user_ads)} ads for user {user_id}")
+    return user_ads
+
+
+def count_user_ads(user_id: int) -> int:
+    """
+    Returns the number of advertisements created by a user.
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        int: Number of the user's advertisements
+    """
+    return repository.user_count(user_id)
+
+
+def get_user_ads_page(user_id: int, offset: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Returns a slice of a user's advertisements in creation order.
+
+    Args:
+        user_id: User ID
+        offset: Number of advertisements to skip
+        limit: Maximum number of advertisements to return
+
+    Returns:
+        List[Dict[str, Any]]: The user's advertisements on the page
+    """
+    return repository.user_page(user_id, offset, limit)
+
+
+def seek_user_ads(
+    user_id: int, cursor: Optional[int], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Returns a user's advertisements next to a cursor in creation order.
+
+    Args:
+        user_id: User ID
+        cursor: ID of the last seen advertisement, None to start at an end
+        limit: Maximum number of advertisements to return
+        backward: Return the advertisements before the cursor instead
+
+    Returns:
+        List[Dict[str, Any]]: The user's advertisements on the page
+    """
+    return repository.seek(cursor, limit, backward, user_id=user_id)
+
+
+def delete_ad(ad_id: int, user_id: int) -> bool:
+    """
+    Deletes an advertisement from the list.
+
+    Args:
+        ad_id: Advertisement ID
+        user_id: User ID
+
+    Returns:
+        bool: True if the advertisement was deleted successfully
+    """
+    result = repository.delete(ad_id, user_id)
+
+    if result is None:
+        logger.warning(f"Ad {ad_id} not found or user {user_id} is not the owner")
+        return False
+
+    if result:
+        logger.info(f"Deleted ad {ad_id} by user {user_id}")
+    return result
+
+
+def like_ad(ad_id: int, user_id: int) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Adds like to advertisement if user hasn't liked it yet.
+
+    Args:
+        ad_id: Advertisement ID
+        user_id: User ID who is liking
+
+    Returns:
+        tuple: (Success status, Message, liked advertisement or None)
+    """
+    return repository.like(ad_id, user_id)
+
+
+def get_ad_by_id(ad_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Returns advertisement by ID.
+
+    Args:
+        ad_id: Advertisement ID
+
+    Returns:
+        Optional[Dict[str, Any]]: Advertisement or None
+    """
+    return repository.get(ad_id)
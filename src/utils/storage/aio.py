@@ -0,0 +1,131 @@
+# utils/storage/aio.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional, Callable, Tuple, TypeVar
+from utils import storage
+
+T = TypeVar("T")
+
+# Repositories lock per ad, so independent storage calls run in parallel
+STORAGE_WORKERS = 4
+
+_executor = ThreadPoolExecutor(
+    max_workers=STORAGE_WORKERS, thread_name_prefix="storage"
+)
+
+
+async def run_in_storage(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking storage call in the storage executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+def shutdown() -> None:
+    """
+    Waits for pending storage calls and stops the storage executor.
+    """
+    _executor.shutdown(wait=True)
+
+
+async def load_ads() -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.load_ads`."""
+    return await run_in_storage(storage.load_ads)
+
+
+async def save_ads(ads: List[Dict[str, Any]]) -> bool:
+    """Async variant of :func:`utils.storage.save_ads`."""
+    return await run_in_storage(storage.save_ads, ads)
+
+
+async def count_ads() -> int:
+    """Async variant of :func:`utils.storage.count_ads`."""
+    return await run_in_storage(storage.count_ads)
+
+
+async def get_ads_page(offset: int, limit: int) -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.get_ads_page`."""
+    return await run_in_storage(storage.get_ads_page, offset, limit)
+
+
+async def seek_ads(
+    cursor: Optional[int], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.seek_ads`."""
+    return await run_in_storage(storage.seek_ads, cursor, limit, backward)
+
+
+async def add_ad(
+    user_id: int, ad_type: str, content: str = "", file_id: str = "", caption: str = ""
+) -> bool:
+    """Async variant of :func:`utils.storage.add_ad`."""
+    return await run_in_storage(
+        storage.add_ad,
+        user_id,
+        ad_type,
+        content=content,
+        file_id=file_id,
+        caption=caption,
+    )
+
+
+async def get_user_ads(user_id: int) -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.get_user_ads`."""
+    return await run_in_storage(storage.get_user_ads, user_id)
+
+
+async def count_user_ads(user_id: int) -> int:
+    """Async variant of :func:`utils.storage.count_user_ads`."""
+    return await run_in_storage(storage.count_user_ads, user_id)
+
+
+async def get_user_ads_page(
+    user_id: int, offset: int, limit: int
+) -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.get_user_ads_page`."""
+    return await run_in_storage(storage.get_user_ads_page, user_id, offset, limit)
+
+
+async def seek_user_ads(
+    user_id: int, cursor: Optional[int], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.seek_user_ads`."""
+    return await run_in_storage(storage.seek_user_ads, user_id, cursor, limit, backward)
+
+
+async def get_top_ads(
+    cursor: Optional[Tuple[int, int]], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.get_top_ads`."""
+    return await run_in_storage(storage.get_top_ads, cursor, limit, backward)
+
+
+async def search_ads(
+    query: str, cursor: Optional[int], limit: int, backward: bool = False
+) -> List[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.search_ads`."""
+    return await run_in_storage(storage.search_ads, query, cursor, limit, backward)
+
+
+async def count_search_results(query: str) -> int:
+    """Async variant of :func:`utils.storage.count_search_results`."""
+    return await run_in_storage(storage.count_search_results, query)
+
+
+async def delete_ad(ad_id: int, user_id: int) -> bool:
+    """Async variant of :func:`utils.storage.delete_ad`."""
+    return await run_in_storage(storage.delete_ad, ad_id, user_id)
+
+
+async def like_ad(
+    ad_id: int, user_id: int
+) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+    """Async variant of :func:`utils.storage.like_ad`."""
+    return await run_in_storage(storage.like_ad, ad_id, user_id)
+
+
+async def get_ad_by_id(ad_id: int) -> Optional[Dict[str, Any]]:
+    """Async variant of :func:`utils.storage.get_ad_by_id`."""
+    return await run_in_storage(storage.get_ad_by_id, ad_id)
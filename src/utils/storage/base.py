@@ -0,0 +1,144 @@
+# utils/storage/base.py
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+AD_NOT_FOUND = "Advertisement not found"
+ALREADY_LIKED = "You already liked this advertisement"
+LIKE_SAVE_FAILED = "Failed to save like"
+
+
+MutationListener = Callable[[str, Optional[int], Optional[int]], None]
+
+
+def liked_message(likes: int) -> str:
+    return f"Liked! Total likes: {likes}"
+
+
+class StorageBackend(ABC):
+    """
+    Interface implemented by every advertisement storage backend.
+
+    Ads are plain dicts with "id", "user_id", "type", "likes" and, depending
+    on the type, "content" or "file_id" with an optional "caption".
+
+    When ``deferred`` is set, mutations are applied immediately but only
+    written to disk by :meth:`flush`. ``pending_listener`` is called with the
+    number of unwritten mutations every time one is deferred.
+
+    Every function in ``mutation_listeners`` is called as
+    ``listener(op, ad_id, owner_id)`` after an ad is added, liked or deleted
+    ("add", "like", "delete") and with
+    ``("replace", None, None)`` when all ads are replaced or reloaded.
+    Listeners run on the thread performing the mutation.
+    """
+
+    def __init__(self) -> None:
+        self.deferred = False
+        self.pending_listener: Optional[Callable[[int], None]] = None
+        self.mutation_listeners: List[MutationListener] = []
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of mutations that are not written to disk yet."""
+        return self._pending
+
+    def _defer(self) -> None:
+        self._pending += 1
+        if self.pending_listener is not None:
+            self.pending_listener(self._pending)
+
+    def _notify(
+        self, op: str, ad_id: Optional[int] = None, owner_id: Optional[int] = None
+    ) -> None:
+        for listener in self.mutation_listeners:
+            listener(op, ad_id, owner_id)
+
+    def flush(self) -> int:
+        """Writes deferred mutations and returns how many were written."""
+        return 0
+
+    @abstractmethod
+    def load(self) -> None:
+        """Prepares the backend for use (reads files, opens connections)."""
+
+    def close(self) -> None:
+        """Releases any resources held by the backend."""
+
+    @abstractmethod
+    def all(self) -> List[Dict[str, Any]]:
+        """Returns all ads in creation order."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Returns the number of stored ads."""
+
+    @abstractmethod
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Returns up to ``limit`` ads in creation order starting at ``offset``."""
+
+    @abstractmethod
+    def seek(
+        self,
+        cursor: Optional[int],
+        limit: int,
+        backward: bool = False,
+        user_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns up to ``limit`` ads in creation order that follow the ad with
+        ID ``cursor``, or precede it when ``backward`` is set. Without a
+        cursor the first (or last) ads are returned. ``user_id`` restricts
+        the result to that user's ads.
+        """
+
+    @abstractmethod
+    def top(
+        self, cursor: Optional[Tuple[int, int]], limit: int, backward: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns up to ``limit`` ads ranked by likes, most liked first and
+        newest first among equally liked ads. ``cursor`` is the (likes, id)
+        pair of the last ad seen; the ads ranked below it are returned, or
+        those ranked above it when ``backward`` is set.
+        """
+
+    @abstractmethod
+    def replace(self, ads: List[Dict[str, Any]]) -> bool:
+        """Replaces all stored ads."""
+
+    @abstractmethod
+    def add(self, new_ad: Dict[str, Any]) -> bool:
+        """Stores a new ad and assigns its "id"."""
+
+    @abstractmethod
+    def user_ads(self, user_id: int) -> List[Dict[str, Any]]:
+        """Returns all ads created by a user."""
+
+    @abstractmethod
+    def user_count(self, user_id: int) -> int:
+        """Returns the number of ads created by a user."""
+
+    @abstractmethod
+    def user_page(self, user_id: int, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Returns up to ``limit`` of a user's ads starting at ``offset``."""
+
+    @abstractmethod
+    def delete(self, ad_id: int, user_id: int) -> Optional[bool]:
+        """
+        Returns None if the ad does not exist or belongs to another user,
+        otherwise whether the deletion was saved.
+        """
+
+    @abstractmethod
+    def like(
+        self, ad_id: int, user_id: int
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """
+        Adds a like once per user and returns (success, message, ad), where
+        ad is the liked ad as of this like or None if nothing was liked.
+        """
+
+    @abstractmethod
+    def get(self, ad_id: int) -> Optional[Dict[str, Any]]:
+        """Returns an ad by ID or None."""
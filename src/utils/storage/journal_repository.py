@@ -0,0 +1,247 @@
+# utils/storage/journal_repository.py
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from utils.logger import get_logger
+from utils.storage.json_repository import AdRepository, ADS_FILE
+
+logger = get_logger(__name__)
+
+JOURNAL_FILE = "ads.journal"
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+
+class JournaledAdRepository(AdRepository):
+    """
+    Advertisement repository that stores mutations in an append-only journal.
+
+    Each add, like or delete is appended to the journal as one compact JSON
+    line instead of rewriting the whole snapshot. On load the journal is
+    replayed on top of the last snapshot. Once the journal grows past
+    ``compact_bytes`` it is rotated and folded into a fresh snapshot by a
+    background thread. Replaying a record twice is harmless, so a crash in
+    the middle of a compaction never corrupts the data.
+    """
+
+    def __init__(
+        self,
+        path: str = ADS_FILE,
+        journal_path: str = JOURNAL_FILE,
+        compact_bytes: int = JOURNAL_COMPACT_BYTES,
+        snapshot_format: str = "json",
+        legacy_path: Optional[str] = None,
+    ) -> None:
+        super().__init__(path, snapshot_format, legacy_path)
+        self.journal_path = journal_path
+        self.rotated_path = journal_path + ".old"
+        self.compact_bytes = compact_bytes
+        self._journal = None
+        self._buffer: List[str] = []
+        self._compaction: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _apply(ads: Dict[int, Dict[str, Any]], record: dict) -> None:
+        """
+        Applies a journal record to the id -> ad index. Records that were
+        already applied are ignored.
+        """
+        op = record.get("op")
+
+        if op == "add":
+            ad = record["ad"]
+            ads.setdefault(ad["id"], ad)
+        elif op == "like":
+            ad = ads.get(record["id"])
+            if ad is not None:
+                liked_by = ad.get("liked_by")
+                if not isinstance(liked_by, set):
+                    liked_by = ad["liked_by"] = set(liked_by or ())
+                if record["user_id"] not in liked_by:
+                    liked_by.add(record["user_id"])
+                    ad["likes"] = ad.get("likes", 0) + 1
+        elif op == "delete":
+            ads.pop(record["id"], None)
+
+    def _replay(self, path: str, ads: Dict[int, Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Replays a journal file and returns (records replayed, highest added ID).
+        """
+        replayed = highest = 0
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            # Missing, or removed by a compaction that finished in the meantime
+            return 0, 0
+
+        with f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt record {line_number} in {path}")
+                    continue
+                self._apply(ads, record)
+                if record.get("op") == "add":
+                    highest = max(highest, record["ad"]["id"])
+                replayed += 1
+        return replayed, highest
+
+    def _read_state(self) -> Tuple[Dict[int, Dict[str, Any]], int, int]:
+        ads, next_id, renumbered = super()._read_state()
+
+        replayed = 0
+        for path in (self.rotated_path, self.journal_path):
+            count, highest = self._replay(path, ads)
+            replayed += count
+            next_id = max(next_id, highest + 1)
+        if replayed:
+            logger.info(f"Replayed {replayed} journal records from {self.journal_path}")
+
+        return ads, next_id, renumbered
+
+    def load(self) -> None:
+        super().load()
+
+        # A leftover rotated journal means the last compaction did not finish
+        if os.path.exists(self.rotated_path) and not self._is_compacting():
+            with self._write_lock:
+                if os.path.exists(self.rotated_path) and not self._is_compacting():
+                    self._wait_for_compaction()
+                    self._start_compaction()
+
+    def _is_compacting(self) -> bool:
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def _wait_for_compaction(self) -> None:
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def _append(self, lines: List[str]) -> bool:
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write("".join(lines))
+            self._journal.flush()
+            return True
+        except Exception as e:
+            logger.error(f"Error appending to journal {self.journal_path}: {e}")
+            return False
+
+    def _write_buffer(self) -> int:
+        """
+        Appends buffered records to the journal. On failure they stay
+        buffered so the next flush retries them.
+        """
+        lines, self._buffer = self._buffer, []
+        if not lines:
+            return 0
+
+        if not self._append(lines):
+            self._buffer = lines + self._buffer
+            return 0
+
+        self._pending = len(self._buffer)
+        return len(lines)
+
+    def _maybe_compact(self) -> None:
+        if (
+            self._journal is not None
+            and self._journal.tell() >= self.compact_bytes
+            and not self._is_compacting()
+        ):
+            self._start_compaction()
+
+    def _persist(self, record: Dict[str, Any]) -> bool:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+        with self._write_lock:
+            if self.deferred:
+                self._buffer.append(line)
+                self._defer()
+                return True
+
+            if not self._append([line]):
+                self._loaded = False
+                return False
+
+            self._maybe_compact()
+            return True
+
+    def flush(self) -> int:
+        with self._write_lock:
+            flushed = self._write_buffer()
+            if flushed:
+                self._maybe_compact()
+            return flushed
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _start_compaction(self) -> None:
+        """
+        Rotates the journal and writes a fresh snapshot in a background thread.
+        Must be called with the write lock held.
+        """
+        # Buffered records are part of the in-memory state copied below,
+        # so they have to reach the journal that is about to be rotated
+        self._write_buffer()
+        if self._buffer:
+            logger.error("Journal compaction postponed, buffered records unsaved")
+            return
+
+        snapshot = self._snapshot()
+
+        self._close_journal()
+        if os.path.exists(self.journal_path):
+            if os.path.exists(self.rotated_path):
+                # Fold the leftover journal into the rotated one before compacting
+                with open(self.rotated_path, "a", encoding="utf-8") as rotated:
+                    with open(self.journal_path, "r", encoding="utf-8") as journal:
+                        rotated.write(journal.read())
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self.rotated_path)
+
+        self._compaction = threading.Thread(
+            target=self._compact,
+            args=(snapshot, self._generation),
+            name="ads-compaction",
+            daemon=True,
+        )
+        self._compaction.start()
+
+    def _compact(self, snapshot: Dict[str, Any], generation: int) -> None:
+        if self._write_file(snapshot, generation):
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
+            count = len(snapshot["ads"])
+            logger.info(f"Compacted journal into a snapshot of {count} ads")
+        elif generation == self._generation:
+            logger.error("Journal compaction failed, keeping rotated journal")
+
+    def _replace_locked(self, ads: List[Dict[str, Any]], next_id: int) -> bool:
+        # A running compaction sees the new generation and discards its result
+        self._close_journal()
+        self._buffer = []
+        self._pending = 0
+
+        if not super()._replace_locked(ads, next_id):
+            return False
+
+        for path in (self.journal_path, self.rotated_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return True
+
+    def close(self) -> None:
+        self.flush()
+        self._wait_for_compaction()
+        with self._write_lock:
+            self._close_journal()
@@ -0,0 +1,513 @@
+# utils/storage/json_repository.py
+import os
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager, ExitStack
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterator, Union
+from utils.logger import get_logger
+from utils.storage.base import (
+    StorageBackend,
+    AD_NOT_FOUND,
+    ALREADY_LIKED,
+    LIKE_SAVE_FAILED,
+    liked_message,
+)
+from utils.storage.snapshot import (
+    SNAPSHOT_FORMATS,
+    SnapshotError,
+    parse_snapshot,
+    encode_snapshot,
+    decode_snapshot,
+)
+
+logger = get_logger(__name__)
+
+ADS_FILE = "ads.json"
+LOCK_STRIPES = 64
+
+
+def index_ads(
+    ads: List[Dict[str, Any]], next_id: int
+) -> Tuple[Dict[int, Dict[str, Any]], int, int]:
+    """
+    Builds the id -> ad index. Ads sharing an ID with an earlier ad, as left
+    behind by the old length-based allocator, are given fresh IDs.
+
+    Returns:
+        Tuple: (index, next free ID, number of renumbered ads)
+    """
+    index: Dict[int, Dict[str, Any]] = {}
+    renumbered = 0
+
+    for ad in ads:
+        if ad["id"] in index:
+            ad["id"] = next_id
+            next_id += 1
+            renumbered += 1
+        index[ad["id"]] = ad
+
+    return index, next_id, renumbered
+
+
+class AdRepository(StorageBackend):
+    """
+    In-memory advertisement repository backed by a snapshot file.
+
+    Ads are read from disk once and then served from memory. Every mutation
+    is written through to the file. Before each access the file's mtime and
+    size are compared with the last known values, so manual edits of the
+    file are picked up without a restart.
+
+    Ads are indexed by ID in insertion order, so lookups, likes and deletes
+    do not depend on the number of stored ads. IDs come from a sequence that
+    is saved with the snapshot and never hands out an ID twice. A sorted list
+    of all IDs and a secondary index mapping each user to the sorted IDs of
+    their ads serve pages by position or by cursor with a binary search.
+    The ranking by likes is a sorted list of (likes, id) pairs that adds,
+    likes and deletes update in place, so reading it costs a binary search.
+
+    Likers are kept per ad, separate from the ad itself, and the ad's
+    "likes" field is the stored count. Loaded likers stay a compact sorted
+    int64 array until the ad is liked again, when they become a set. On disk
+    they are written as a sorted "liked_by" array.
+
+    ``snapshot_format`` selects compact JSON or the binary record format of
+    :mod:`utils.storage.snapshot`; either is read back regardless of the
+    setting. If ``path`` does not exist yet but ``legacy_path`` does, the
+    legacy file is loaded, written to ``path`` in the new format and renamed
+    with a ".migrated" suffix.
+
+    The repository may be used from several threads at once. Likes and
+    deletes lock only the stripe their ad ID hashes to, the ID sequence and
+    the per-user index sit behind a short index lock, and writes to disk
+    are serialized by a write lock. Lock order is stripe -> index -> write
+    -> swap; only a reload or a full replace takes every lock. Readers get
+    plain copies of the dicts, which CPython makes atomically, so callers
+    may modify them without touching the stored ads.
+
+    A file that cannot be parsed after an edit is ignored and the ads in
+    memory are kept; only the very first load starts empty.
+    """
+
+    def __init__(
+        self,
+        path: str = ADS_FILE,
+        snapshot_format: str = "json",
+        legacy_path: Optional[str] = None,
+    ) -> None:
+        super().__init__()
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+        self.path = path
+        self.snapshot_format = snapshot_format
+        self.legacy_path = legacy_path
+        self._migrating = False
+        self._ads: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 1
+        self._ids: List[int] = []
+        self._by_user: Dict[int, List[int]] = {}
+        self._ranking: List[Tuple[int, int]] = []
+        self._likers: Dict[int, Union[Set[int], array]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        # Signature of an edited file that failed to parse, not retried
+        self._rejected_signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._index_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        # Guards swapping the file in; held briefly, even by background writers
+        self._swap_lock = threading.RLock()
+        # Bumped whenever the whole state is replaced, see _write_file
+        self._generation = 0
+
+    def _stripe(self, ad_id: int) -> threading.Lock:
+        return self._stripes[ad_id % LOCK_STRIPES]
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """
+        Holds every lock, for operations that swap the whole state.
+        """
+        with ExitStack() as stack:
+            for lock in self._stripes:
+                stack.enter_context(lock)
+            stack.enter_context(self._index_lock)
+            stack.enter_context(self._write_lock)
+            stack.enter_context(self._swap_lock)
+            yield
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns (mtime_ns, size) of the backing file or None if it is missing.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_file(self) -> Tuple[List[Dict[str, Any]], int]:
+        path = self.path
+        if (
+            not os.path.exists(path)
+            and self.legacy_path
+            and os.path.exists(self.legacy_path)
+        ):
+            logger.info(f"Migrating {self.legacy_path} to {self.path}")
+            path = self.legacy_path
+            self._migrating = True
+
+        if not os.path.exists(path):
+            logger.info(f"File {path} not found, creating empty list")
+            return [], 1
+
+        try:
+            with open(path, "rb") as f:
+                ads, next_id = decode_snapshot(f.read())
+                logger.info(f"Loaded {len(ads)} ads from {path}")
+                return ads, next_id
+        except (SnapshotError, FileNotFoundError) as e:
+            logger.error(f"Error loading ads: {e}")
+            self._migrating = False
+            if self._loaded:
+                raise
+            return [], 1
+
+    def _read_state(self) -> Tuple[Dict[int, Dict[str, Any]], int, int]:
+        """
+        Returns (index, next free ID, number of renumbered ads) read from disk.
+        """
+        ads, next_id = self._read_file()
+        return index_ads(ads, next_id)
+
+    def _rebuild_indexes(self) -> None:
+        """
+        Rebuilds the ID indexes and moves "liked_by" out of the ads.
+        """
+        self._ids = sorted(self._ads)
+        self._by_user = {}
+        self._likers = {}
+        for ad_id in self._ids:
+            ad = self._ads[ad_id]
+            self._by_user.setdefault(ad["user_id"], []).append(ad_id)
+            liked_by = ad.pop("liked_by", None)
+            if liked_by:
+                if not isinstance(liked_by, (set, array)):
+                    liked_by = array("q", sorted(liked_by))
+                self._likers[ad_id] = liked_by
+                ad.setdefault("likes", len(liked_by))
+        self._ranking = sorted(
+            (ad.get("likes", 0), ad_id) for ad_id, ad in self._ads.items()
+        )
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """
+        Returns a copy of the current state in its on-disk shape.
+        """
+        ads = []
+        for ad_id, ad in list(self._ads.items()):
+            ad = dict(ad)
+            likers = self._likers.get(ad_id)
+            if likers:
+                # Arrays are never modified in place, so they can be shared
+                ad["liked_by"] = likers if isinstance(likers, array) else sorted(likers)
+            ads.append(ad)
+        return {"next_id": self._next_id, "ads": ads}
+
+    def _write_file(
+        self, snapshot: Dict[str, Any], generation: Optional[int] = None
+    ) -> bool:
+        """
+        Writes the snapshot to a temporary file and swaps it in, so readers
+        never see a half-written file. A snapshot taken at an older
+        ``generation`` is discarded instead of replacing newer state.
+        """
+        ads = snapshot["ads"]
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(encode_snapshot(snapshot, self.snapshot_format))
+                # Swap and remember the new signature in one step, otherwise
+                # a concurrent load() would take our own write for an edit
+                with self._swap_lock:
+                    if generation is not None and generation != self._generation:
+                        logger.info("Discarded a snapshot of replaced state")
+                        os.remove(tmp_path)
+                        return False
+                    os.replace(tmp_path, self.path)
+                    self._signature = self._file_signature()
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            logger.info(f"Saved {len(ads)} ads to {self.path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving ads: {e}")
+            return False
+
+    def _is_current(self, signature: Optional[Tuple[int, int]]) -> bool:
+        """
+        Returns whether the ads in memory are up to date for a file with
+        ``signature``, which is the case for a file that failed to parse too.
+        """
+        if not self._loaded:
+            return False
+        if signature == self._signature:
+            return True
+        return signature is not None and signature == self._rejected_signature
+
+    def load(self) -> None:
+        """
+        Loads the file into memory unless the cached copy is still current.
+        """
+        if self._is_current(self._file_signature()):
+            return
+
+        with self._exclusive():
+            # Another thread may have reloaded while we waited for the locks
+            signature = self._file_signature()
+            if self._is_current(signature):
+                return
+
+            if self._loaded and self._pending:
+                logger.warning(
+                    f"{self.path} changed on disk with {self._pending} unsaved "
+                    "changes, keeping the in-memory copy"
+                )
+                self._signature = signature
+                return
+
+            try:
+                self._ads, next_id, renumbered = self._read_state()
+            except (SnapshotError, FileNotFoundError):
+                logger.error(
+                    f"Keeping the {len(self._ads)} ads in memory, "
+                    f"{self.path} is overwritten on the next change"
+                )
+                self._rejected_signature = signature
+                return
+            self._generation += 1
+            # IDs handed out but not yet saved must never be reused
+            self._next_id = max(next_id, self._next_id)
+            self._rebuild_indexes()
+            self._signature = signature
+            self._loaded = True
+            self._notify("replace")
+
+            if renumbered:
+                logger.warning(f"Gave new IDs to {renumbered} ads with duplicate IDs")
+            if renumbered or self._migrating:
+                saved = self._write_file(self._snapshot())
+                if saved and self._migrating:
+                    os.replace(self.legacy_path, self.legacy_path + ".migrated")
+                    logger.info(f"Migrated {len(self._ads)} ads to {self.path}")
+                self._migrating = False
+
+    def _commit(self) -> bool:
+        """
+        Writes the cached ads through to disk.
+        On failure the cache is dropped so the next access re-reads the file.
+        """
+        with self._write_lock:
+            result = self._write_file(self._snapshot())
+            if result:
+                self._pending = 0
+            else:
+                self._loaded = False
+            return result
+
+    def _persist(self, record: Dict[str, Any]) -> bool:
+        """
+        Makes a single mutation durable. The plain JSON repository simply
+        rewrites the whole file; subclasses may store the record itself.
+        """
+        if self.deferred:
+            with self._write_lock:
+                self._defer()
+            return True
+        return self._commit()
+
+    def flush(self) -> int:
+        with self._write_lock:
+            pending = self._pending
+            if not pending:
+                return 0
+
+            # Keep the cache on failure: it holds changes that are not on disk
+            if not self._write_file(self._snapshot()):
+                return 0
+
+            self._pending = 0
+            return pending
+
+    def close(self) -> None:
+        self.flush()
+
+    def all(self) -> List[Dict[str, Any]]:
+        self.load()
+        return [dict(ad) for ad in list(self._ads.values())]
+
+    def count(self) -> int:
+        self.load()
+        return len(self._ads)
+
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        self.load()
+        return self._lookup(self._ids[offset : offset + limit])
+
+    @staticmethod
+    def _seek_ids(
+        ad_ids: List[int], cursor: Optional[int], limit: int, backward: bool
+    ) -> List[int]:
+        if backward:
+            end = len(ad_ids) if cursor is None else bisect_left(ad_ids, cursor)
+            return ad_ids[max(end - limit, 0) : end]
+        start = 0 if cursor is None else bisect_right(ad_ids, cursor)
+        return ad_ids[start : start + limit]
+
+    def seek(
+        self,
+        cursor: Optional[int],
+        limit: int,
+        backward: bool = False,
+        user_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        self.load()
+        ad_ids = self._ids if user_id is None else self._by_user.get(user_id, [])
+        return self._lookup(self._seek_ids(ad_ids, cursor, limit, backward))
+
+    def top(
+        self, cursor: Optional[Tuple[int, int]], limit: int, backward: bool = False
+    ) -> List[Dict[str, Any]]:
+        self.load()
+        ranking = self._ranking
+        key = None if cursor is None else tuple(cursor)
+        # The list ascends, the ranking descends
+        if backward:
+            start = 0 if key is None else bisect_right(ranking, key)
+            keys = ranking[start : start + limit]
+        else:
+            end = len(ranking) if key is None else bisect_left(ranking, key)
+            keys = ranking[max(end - limit, 0) : end]
+        return self._lookup([ad_id for _, ad_id in reversed(keys)])
+
+    def replace(self, ads: List[Dict[str, Any]]) -> bool:
+        ads, next_id = parse_snapshot(list(ads))
+        with self._exclusive():
+            return self._replace_locked(ads, next_id)
+
+    def _replace_locked(self, ads: List[Dict[str, Any]], next_id: int) -> bool:
+        self._ads, self._next_id, _ = index_ads(ads, max(next_id, self._next_id))
+        self._generation += 1
+        self._rebuild_indexes()
+        self._loaded = True
+        self._notify("replace")
+        return self._commit()
+
+    def add(self, new_ad: Dict[str, Any]) -> bool:
+        self.load()
+        with self._index_lock:
+            ad_id = self._next_id
+            self._next_id += 1
+
+        # Hold the new ad's stripe so no like can be persisted before the add
+        with self._stripe(ad_id):
+            new_ad["id"] = ad_id
+            with self._index_lock:
+                self._ads[ad_id] = new_ad
+                self._insert_id(self._ids, ad_id)
+                self._insert_id(self._by_user.setdefault(new_ad["user_id"], []), ad_id)
+                insort(self._ranking, (new_ad.get("likes", 0), ad_id))
+            self._notify("add", ad_id, new_ad["user_id"])
+            return self._persist({"op": "add", "ad": new_ad})
+
+    @staticmethod
+    def _insert_id(ad_ids: List[int], ad_id: int) -> None:
+        # Keep the list sorted even if a later ID was inserted first
+        if ad_ids and ad_ids[-1] > ad_id:
+            ad_ids.insert(bisect_left(ad_ids, ad_id), ad_id)
+        else:
+            ad_ids.append(ad_id)
+
+    def _lookup(self, ad_ids: List[int]) -> List[Dict[str, Any]]:
+        ads = [self._ads.get(ad_id) for ad_id in ad_ids]
+        return [dict(ad) for ad in ads if ad is not None]
+
+    def user_ads(self, user_id: int) -> List[Dict[str, Any]]:
+        self.load()
+        return self._lookup(list(self._by_user.get(user_id, [])))
+
+    def user_count(self, user_id: int) -> int:
+        self.load()
+        return len(self._by_user.get(user_id, []))
+
+    def user_page(self, user_id: int, offset: int, limit: int) -> List[Dict[str, Any]]:
+        self.load()
+        ad_ids = self._by_user.get(user_id, [])[offset : offset + limit]
+        return self._lookup(ad_ids)
+
+    def delete(self, ad_id: int, user_id: int) -> Optional[bool]:
+        """
+        Returns None if the ad does not exist or belongs to another user,
+        otherwise the result of writing the change to disk.
+        """
+        self.load()
+        with self._stripe(ad_id):
+            ad = self._ads.get(ad_id)
+            if ad is None or ad["user_id"] != user_id:
+                return None
+
+            with self._index_lock:
+                del self._ads[ad_id]
+                self._likers.pop(ad_id, None)
+                del self._ids[bisect_left(self._ids, ad_id)]
+                user_ad_ids = self._by_user[user_id]
+                del user_ad_ids[bisect_left(user_ad_ids, ad_id)]
+                if not user_ad_ids:
+                    del self._by_user[user_id]
+                rank = bisect_left(self._ranking, (ad.get("likes", 0), ad_id))
+                del self._ranking[rank]
+            self._notify("delete", ad_id, user_id)
+            return self._persist({"op": "delete", "id": ad_id})
+
+    def like(
+        self, ad_id: int, user_id: int
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        self.load()
+        with self._stripe(ad_id):
+            ad = self._ads.get(ad_id)
+
+            if ad is None:
+                logger.warning(f"Ad {ad_id} not found for liking")
+                return False, AD_NOT_FOUND, None
+
+            likers = self._likers.get(ad_id)
+            if not isinstance(likers, set):
+                likers = self._likers[ad_id] = set(likers or ())
+            if user_id in likers:
+                return False, ALREADY_LIKED, None
+
+            likers.add(user_id)
+            with self._index_lock:
+                likes = ad.get("likes", 0)
+                del self._ranking[bisect_left(self._ranking, (likes, ad_id))]
+                ad["likes"] = likes = likes + 1
+                insort(self._ranking, (likes, ad_id))
+            liked = dict(ad)
+            self._notify("like", ad_id, ad["user_id"])
+
+            if not self._persist({"op": "like", "id": ad_id, "user_id": user_id}):
+                return False, LIKE_SAVE_FAILED, None
+
+        logger.info(f"User {user_id} liked ad {ad_id}, total likes: {likes}")
+        return True, liked_message(likes), liked
+
+    def get(self, ad_id: int) -> Optional[Dict[str, Any]]:
+        self.load()
+        ad = self._ads.get(ad_id)
+        return dict(ad) if ad is not None else None
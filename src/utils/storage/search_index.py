@@ -0,0 +1,387 @@
+# utils/storage/search_index.py
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from utils.logger import get_logger
+from utils.storage.base import StorageBackend
+
+logger = get_logger(__name__)
+
+SEARCH_INDEX_FILE = "ads.index"
+INDEX_VERSION = 2
+# Fields of an ad that are searchable
+TEXT_FIELDS = ("content", "caption")
+# Result lists of this many recent queries are kept until the next change
+MAX_CACHED_QUERIES = 64
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens.
+    """
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def ad_tokens(ad: Dict[str, Any]) -> Tuple[str, ...]:
+    """
+    Returns the distinct tokens of an ad's text and caption.
+    """
+    tokens: Dict[str, None] = {}
+    for field in TEXT_FIELDS:
+        if ad.get(field):
+            tokens.update(dict.fromkeys(tokenize(ad[field])))
+    return tuple(tokens)
+
+
+def text_digest(ad: Dict[str, Any]) -> int:
+    """
+    Returns a 64-bit digest of an ad's text and caption, which tells whether
+    the tokens indexed for its ID still match it.
+    """
+    text = "\x00".join(ad.get(field) or "" for field in TEXT_FIELDS)
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def store_fingerprint(repository: StorageBackend) -> str:
+    """
+    Returns what identifies the store a backend keeps its ads in.
+    """
+    path = getattr(repository, "path", "")
+    return f"{type(repository).__name__}:{os.path.abspath(path) if path else ''}"
+
+
+class SearchIndex:
+    """
+    Inverted index over the text and captions of the stored ads.
+
+    Every token maps to the IDs of the ads containing it. A sorted
+    vocabulary finds all tokens starting with a query term by binary
+    search, so each term matches as a prefix; the ads of a query must match
+    all of its terms.
+
+    The index follows the backend's mutation events. An addition only
+    queues its ID and queued ads are tokenized by the next search. A
+    deletion leaves a tombstone that hides the ad from results until
+    :meth:`save` purges it from the postings. A replace or reload is
+    reconciled on the next search by comparing the IDs and a digest of
+    every ad's text with those indexed, so only new ads and ads whose text
+    changed (edited by hand, replaced, or a reused ID) are tokenized.
+    Listeners run while the backend holds its locks, so the index never
+    reads from the backend while holding its own lock.
+
+    The postings and digests are saved to ``path`` by :meth:`save`, with a
+    fingerprint of the backend's store, and read back on first use. A file
+    of another store is ignored; a stale file of the same store is
+    harmless, since it is reconciled with the backend like a reload.
+    """
+
+    def __init__(self, path: str = SEARCH_INDEX_FILE) -> None:
+        self.path = path
+        self._repository: Optional[StorageBackend] = None
+        self._lock = threading.Lock()
+        # Serializes reconciliations, which read from the backend
+        self._sync_lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []
+        # ID -> text digest of the ads in the postings, including deleted ones
+        self._indexed: Dict[int, int] = {}
+        # Indexed IDs of ads without any text
+        self._empty: Set[int] = set()
+        self._deleted: Set[int] = set()
+        self._pending: Set[int] = set()
+        # IDs deleted while a reconciliation is reading from the backend
+        self._deleted_during_sync: Optional[Set[int]] = None
+        self._replaces = 0
+        self._loaded = False
+        self._synced = False
+        self._dirty = False
+        self._results: OrderedDict[Tuple[str, ...], List[int]] = OrderedDict()
+
+    def attach(self, repository: StorageBackend) -> None:
+        """
+        Starts following a backend; the index is reconciled with it on the
+        next search.
+        """
+        with self._lock:
+            self._repository = repository
+            self._synced = False
+            self._results.clear()
+        repository.mutation_listeners.append(self.on_mutation)
+
+    def on_mutation(
+        self, op: str, ad_id: Optional[int], owner_id: Optional[int]
+    ) -> None:
+        """
+        Storage mutation listener, see :class:`StorageBackend`.
+        """
+        if op == "like":
+            return
+
+        with self._lock:
+            self._results.clear()
+            if op == "add":
+                self._pending.add(ad_id)
+            elif op == "delete":
+                self._pending.discard(ad_id)
+                self._delete(ad_id)
+                if self._deleted_during_sync is not None:
+                    self._deleted_during_sync.add(ad_id)
+            elif op == "replace":
+                self._replaces += 1
+                self._synced = False
+
+    def _add(self, ad_id: int, digest: int, tokens: Tuple[str, ...]) -> None:
+        if not tokens:
+            self._empty.add(ad_id)
+        for token in tokens:
+            ad_ids = self._postings.get(token)
+            if ad_ids is None:
+                ad_ids = self._postings[token] = set()
+                insort(self._vocabulary, token)
+            ad_ids.add(ad_id)
+        self._indexed[ad_id] = digest
+        self._dirty = True
+
+    def _delete(self, ad_id: int) -> None:
+        if ad_id in self._indexed and ad_id not in self._deleted:
+            self._deleted.add(ad_id)
+            self._dirty = True
+
+    def _remove(self, removed: Set[int]) -> None:
+        """
+        Removes ads from the postings.
+        """
+        for token, ad_ids in list(self._postings.items()):
+            if not ad_ids.isdisjoint(removed):
+                ad_ids -= removed
+                if not ad_ids:
+                    del self._postings[token]
+        self._vocabulary = sorted(self._postings)
+        for ad_id in removed:
+            self._indexed.pop(ad_id, None)
+        self._empty -= removed
+        self._deleted -= removed
+        self._dirty = True
+
+    def _purge(self) -> None:
+        """
+        Removes the deleted ads from the postings.
+        """
+        if self._deleted:
+            self._remove(self._deleted)
+
+    def _read_file(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                logger.warning(f"Ignoring {self.path} of another version")
+                return
+            if data.get("store") != store_fingerprint(self._repository):
+                logger.warning(f"Ignoring {self.path} of another store")
+                return
+            self._postings = {
+                token: set(ad_ids) for token, ad_ids in data["postings"].items()
+            }
+            self._empty = set(data["empty"])
+            self._indexed = {
+                int(ad_id): digest for ad_id, digest in data["digests"].items()
+            }
+        except (OSError, ValueError, KeyError, AttributeError, TypeError) as e:
+            logger.error(f"Error loading {self.path}, rebuilding it: {e}")
+            self._postings, self._empty, self._indexed = {}, set(), {}
+        self._vocabulary = sorted(self._postings)
+        logger.info(f"Loaded search index of {len(self._indexed)} ads")
+
+    def _sync(self) -> None:
+        """
+        Brings the index up to date with the backend.
+        """
+        with self._lock:
+            if self._loaded and self._synced and not self._pending:
+                return
+
+        with self._sync_lock:
+            with self._lock:
+                if not self._loaded:
+                    self._read_file()
+                    self._loaded = True
+                full = not self._synced
+                replaces = self._replaces
+                pending, self._pending = self._pending, set()
+                self._deleted_during_sync = set()
+
+            try:
+                if full:
+                    ads = self._repository.all()
+                else:
+                    ads = [self._repository.get(ad_id) for ad_id in pending]
+                ads = [ad for ad in ads if ad is not None]
+                digests = {ad["id"]: text_digest(ad) for ad in ads}
+                # The digests may be stale here; they are checked again below
+                tokenized = [
+                    (ad["id"], ad_tokens(ad))
+                    for ad in ads
+                    if self._indexed.get(ad["id"]) != digests[ad["id"]]
+                ]
+            except BaseException:
+                with self._lock:
+                    self._pending |= pending
+                    self._deleted_during_sync = None
+                raise
+
+            with self._lock:
+                deleted, self._deleted_during_sync = self._deleted_during_sync, None
+                if full:
+                    for ad_id in self._indexed.keys() - digests.keys():
+                        self._delete(ad_id)
+                    # A returning ad with the text it was indexed with
+                    self._deleted -= {
+                        ad_id
+                        for ad_id, digest in digests.items()
+                        if self._indexed.get(ad_id) == digest and ad_id not in deleted
+                    }
+                    # A replace while reading needs another reconciliation
+                    self._synced = self._replaces == replaces
+                tokenized = [
+                    (ad_id, tokens)
+                    for ad_id, tokens in tokenized
+                    if ad_id not in deleted
+                    and self._indexed.get(ad_id) != digests[ad_id]
+                ]
+                # The old tokens of a changed ad must not match it any more
+                changed = {ad_id for ad_id, _ in tokenized if ad_id in self._indexed}
+                if changed:
+                    self._remove(changed)
+                for ad_id, tokens in tokenized:
+                    self._add(ad_id, digests[ad_id], tokens)
+
+            if tokenized:
+                logger.info(f"Indexed {len(tokenized)} ads for search")
+
+    def load(self) -> None:
+        """
+        Reads the saved index and reconciles it with the backend.
+        """
+        self._sync()
+
+    def save(self) -> bool:
+        """
+        Indexes queued ads, purges deleted ones and writes the index to disk
+        if it changed since it was loaded or saved.
+
+        Returns:
+            bool: True if the file is up to date
+        """
+        # Queued ads are indexed first, so the next start has nothing to do
+        self._sync()
+        with self._lock:
+            if not self._dirty:
+                return True
+            self._purge()
+            data = {
+                "version": INDEX_VERSION,
+                "store": store_fingerprint(self._repository),
+                "postings": {
+                    token: sorted(ad_ids) for token, ad_ids in self._postings.items()
+                },
+                "empty": sorted(self._empty),
+                "digests": self._indexed,
+            }
+            indexed = len(self._indexed)
+            self._dirty = False
+
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.error(f"Error saving search index: {e}")
+            with self._lock:
+                self._dirty = True
+            return False
+
+        logger.info(f"Saved search index of {indexed} ads to {self.path}")
+        return True
+
+    def _match(self, terms: Tuple[str, ...]) -> List[int]:
+        """
+        Returns the sorted IDs of the ads matching every term as a prefix.
+        Called with the lock.
+        """
+        cached = self._results.get(terms)
+        if cached is not None:
+            self._results.move_to_end(terms)
+            return cached
+
+        matches: Optional[Set[int]] = None
+        for term in terms:
+            ad_ids: Set[int] = set()
+            start = bisect_left(self._vocabulary, term)
+            for token in self._vocabulary[start:]:
+                if not token.startswith(term):
+                    break
+                ad_ids |= self._postings[token]
+            matches = ad_ids if matches is None else matches & ad_ids
+            if not matches:
+                break
+
+        result = sorted((matches or set()) - self._deleted)
+        self._results[terms] = result
+        if len(self._results) > MAX_CACHED_QUERIES:
+            self._results.popitem(last=False)
+        return result
+
+    def matching_ids(self, query: str) -> List[int]:
+        """
+        Returns the sorted IDs of the ads matching a query.
+        """
+        # Longer terms match fewer ads, so they narrow the result first
+        terms = tuple(sorted(set(tokenize(query)), key=len, reverse=True))
+        if not terms:
+            return []
+        self._sync()
+        with self._lock:
+            return self._match(terms)
+
+    def count(self, query: str) -> int:
+        """
+        Returns the number of ads matching a query.
+        """
+        return len(self.matching_ids(query))
+
+    def seek(
+        self, query: str, cursor: Optional[int], limit: int, backward: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns up to ``limit`` matching ads in creation order next to the ad
+        with ID ``cursor``, like :meth:`StorageBackend.seek`.
+        """
+        ad_ids = self.matching_ids(query)
+        if backward:
+            end = len(ad_ids) if cursor is None else bisect_left(ad_ids, cursor)
+            ad_ids = ad_ids[max(end - limit, 0) : end]
+        else:
+            start = 0 if cursor is None else bisect_left(ad_ids, cursor + 1)
+            ad_ids = ad_ids[start : start + limit]
+
+        ads = [self._repository.get(ad_id) for ad_id in ad_ids]
+        return [ad for ad in ads if ad is not None]
@@ -0,0 +1,248 @@
+# utils/storage/snapshot.py
+import json
+import struct
+import sys
+from array import array
+from typing import List, Dict, Any, Tuple, Sequence
+
+SNAPSHOT_FORMATS = ("json", "binary")
+BINARY_ADS_FILE = "ads.bin"
+
+# Binary layout, all integers little-endian:
+#   header: magic, version, next_id, number of ads
+#   per ad: id, user_id, likes, number of likers, then the byte lengths of
+#           type, content, file_id, caption and extra (-1 when absent),
+#           followed by those UTF-8 strings and the likers as int64 values.
+# "extra" is a JSON object with any keys this layout does not know about.
+MAGIC = b"ADSB"
+VERSION = 1
+HEADER = struct.Struct("<4sBqI")
+RECORD = struct.Struct("<qqqI5i")
+STRING_FIELDS = ("type", "content", "file_id", "caption")
+KNOWN_FIELDS = frozenset(("id", "user_id", "likes", "liked_by") + STRING_FIELDS)
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file cannot be decoded."""
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_ad(ad: Any, position: int) -> None:
+    """
+    Raises SnapshotError unless ``ad`` has the fields every backend relies on.
+    """
+    if not isinstance(ad, dict):
+        raise SnapshotError(f"Ad {position} is a {type(ad).__name__}, not an object")
+    if not _is_int(ad.get("id")) or not _is_int(ad.get("user_id")):
+        raise SnapshotError(f"Ad {position} has no integer id or user_id")
+    if not isinstance(ad.get("type"), str):
+        raise SnapshotError(f"Ad {ad['id']} has no type")
+    if "likes" in ad and not _is_int(ad["likes"]):
+        raise SnapshotError(f"Ad {ad['id']} has a non-integer like count")
+    likers = ad.get("liked_by")
+    if isinstance(likers, list):
+        # The sorted int64 array the repositories keep anyway, which also
+        # checks every liker
+        try:
+            ad["liked_by"] = array("q", sorted(likers))
+        except (TypeError, OverflowError) as e:
+            raise SnapshotError(f"Ad {ad['id']} has an invalid liker: {e}") from e
+    elif likers is not None and not isinstance(likers, array):
+        raise SnapshotError(f"Ad {ad['id']} has an invalid liked_by list")
+
+
+def parse_snapshot(data: Any) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Splits snapshot data into the ads and the next free ID.
+    Older files store a bare list of ads; their sequence continues after
+    the highest ID.
+
+    Raises:
+        SnapshotError: If the data does not have the shape of a snapshot,
+            e.g. after a bad manual edit
+    """
+    if isinstance(data, list):
+        ads, next_id = data, 1
+    elif isinstance(data, dict):
+        ads, next_id = data.get("ads", []), data.get("next_id", 1)
+    else:
+        raise SnapshotError(f"Snapshot is a {type(data).__name__}, not ads")
+
+    if not isinstance(ads, list):
+        raise SnapshotError("Snapshot ads are not a list")
+    if not _is_int(next_id):
+        raise SnapshotError("Snapshot next_id is not an integer")
+    for position, ad in enumerate(ads, start=1):
+        _check_ad(ad, position)
+
+    highest = max((ad["id"] for ad in ads), default=0)
+    return ads, max(next_id, highest + 1)
+
+
+def _likers_array(likers: Sequence[int]) -> array:
+    values = array("q", likers)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_binary(snapshot: Dict[str, Any]) -> bytes:
+    """
+    Encodes a snapshot as length-prefixed binary records.
+
+    Args:
+        snapshot: {"next_id": ..., "ads": [...]} with "liked_by" sequences
+
+    Returns:
+        bytes: Encoded snapshot
+    """
+    ads = snapshot["ads"]
+    parts = [HEADER.pack(MAGIC, VERSION, snapshot["next_id"], len(ads))]
+    pack = RECORD.pack
+
+    for ad in ads:
+        strings = [
+            ad[field].encode("utf-8") if ad.get(field) is not None else None
+            for field in STRING_FIELDS
+        ]
+        if strings[0] is None:
+            raise ValueError(f"Ad {ad['id']} has no type")
+        extra = {key: value for key, value in ad.items() if key not in KNOWN_FIELDS}
+        strings.append(
+            json.dumps(extra, ensure_ascii=False).encode("utf-8") if extra else None
+        )
+        likers = ad.get("liked_by") or []
+
+        parts.append(
+            pack(
+                ad["id"],
+                ad["user_id"],
+                ad.get("likes", 0),
+                len(likers),
+                *(len(s) if s is not None else -1 for s in strings),
+            )
+        )
+        parts.extend(s for s in strings if s)
+        if likers:
+            parts.append(_likers_array(likers).tobytes())
+
+    return b"".join(parts)
+
+
+def decode_binary(data: bytes) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Decodes a snapshot written by :func:`encode_binary`. "liked_by" is
+    returned as an int64 array, which is far cheaper to build than a list.
+
+    Returns:
+        Tuple: (ads, next free ID)
+    """
+    if len(data) < HEADER.size:
+        raise SnapshotError("Truncated snapshot header")
+
+    magic, version, next_id, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot format {magic!r} v{version}")
+
+    unpack = RECORD.unpack_from
+    record_size = RECORD.size
+    offset = HEADER.size
+    ads = []
+    append = ads.append
+
+    # Unrolled per field: this loop dominates cold-start time
+    try:
+        for _ in range(count):
+            (
+                ad_id,
+                user_id,
+                likes,
+                liker_count,
+                type_length,
+                content_length,
+                file_id_length,
+                caption_length,
+                extra_length,
+            ) = unpack(data, offset)
+            offset += record_size
+
+            end = offset + type_length
+            ad: Dict[str, Any] = {
+                "id": ad_id,
+                "user_id": user_id,
+                "type": data[offset:end].decode("utf-8"),
+            }
+            offset = end
+            if content_length >= 0:
+                end = offset + content_length
+                ad["content"] = data[offset:end].decode("utf-8")
+                offset = end
+            if file_id_length >= 0:
+                end = offset + file_id_length
+                ad["file_id"] = data[offset:end].decode("utf-8")
+                offset = end
+            if caption_length >= 0:
+                end = offset + caption_length
+                ad["caption"] = data[offset:end].decode("utf-8")
+                offset = end
+            ad["likes"] = likes
+
+            if extra_length >= 0:
+                end = offset + extra_length
+                ad.update(json.loads(data[offset:end]))
+                offset = end
+
+            if liker_count:
+                end = offset + 8 * liker_count
+                likers = array("q")
+                likers.frombytes(data[offset:end])
+                if sys.byteorder == "big":
+                    likers.byteswap()
+                ad["liked_by"] = likers
+                offset = end
+
+            append(ad)
+    except (struct.error, ValueError) as e:
+        raise SnapshotError(f"Corrupt snapshot record {len(ads) + 1}: {e}") from e
+
+    if offset > len(data):
+        raise SnapshotError("Truncated snapshot")
+
+    return ads, next_id
+
+
+def encode_snapshot(snapshot: Dict[str, Any], snapshot_format: str) -> bytes:
+    """
+    Encodes a snapshot in the given format ("json" or "binary").
+    """
+    if snapshot_format == "binary":
+        return encode_binary(snapshot)
+    return json.dumps(
+        snapshot, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+
+def decode_snapshot(data: bytes) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Decodes a snapshot in either format, detected from its first bytes.
+
+    Returns:
+        Tuple: (ads, next free ID)
+    """
+    if data[: len(MAGIC)] == MAGIC:
+        ads, next_id = decode_binary(data)
+        return parse_snapshot({"next_id": next_id, "ads": ads})
+
+    try:
+        return parse_snapshot(json.loads(data))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise SnapshotError(str(e)) from e
@@ -0,0 +1,576 @@
+# utils/storage/sqlite_repository.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from utils.logger import get_logger
+from utils.storage.base import (
+    StorageBackend,
+    AD_NOT_FOUND,
+    ALREADY_LIKED,
+    LIKE_SAVE_FAILED,
+    liked_message,
+)
+from utils.storage.json_repository import index_ads
+from utils.storage.snapshot import SnapshotError, decode_snapshot
+
+logger = get_logger(__name__)
+
+DB_FILE = "ads.db"
+
+# Ads are keyed by an AUTOINCREMENT rowid, so the primary key index also
+# serves creation order. Likes live in their own table whose primary key
+# doubles as the unique (ad_id, user_id) constraint.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    content TEXT,
+    file_id TEXT,
+    caption TEXT,
+    likes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_ads_user_id ON ads (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_ads_likes ON ads (likes, id);
+CREATE TABLE IF NOT EXISTS likes (
+    ad_id INTEGER NOT NULL REFERENCES ads (id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (ad_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    ad_id INTEGER,
+    owner_id INTEGER
+);
+"""
+
+# Most recent changes kept in the change log of a shared database
+CHANGE_LOG_SIZE = 10000
+
+# A shared database logs every change of an ad, so each process can tell
+# the others' changes apart; edits other than likes have no finer event
+CHANGE_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS log_add AFTER INSERT ON ads BEGIN
+    INSERT INTO changes (op, ad_id, owner_id) VALUES ('add', NEW.id, NEW.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS log_delete AFTER DELETE ON ads BEGIN
+    INSERT INTO changes (op, ad_id, owner_id) VALUES ('delete', OLD.id, OLD.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS log_like AFTER UPDATE OF likes ON ads BEGIN
+    INSERT INTO changes (op, ad_id, owner_id) VALUES ('like', NEW.id, NEW.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS log_edit
+AFTER UPDATE OF user_id, type, content, file_id, caption ON ads BEGIN
+    INSERT INTO changes (op) VALUES ('replace');
+END;
+CREATE TRIGGER IF NOT EXISTS trim_changes AFTER INSERT ON changes BEGIN
+    DELETE FROM changes WHERE seq <= NEW.seq - {CHANGE_LOG_SIZE};
+END;
+"""
+
+AD_COLUMNS = "id, user_id, type, content, file_id, caption, likes"
+# Meta key set once the import of a snapshot has been attempted
+IMPORTED_KEY = "imported_from"
+
+
+class _Unchanged(Exception):
+    """Raised inside _mutation() to roll back a mutation that did nothing."""
+
+
+class SqliteAdRepository(StorageBackend):
+    """
+    Advertisement storage backed by a local SQLite database.
+
+    Every mutation runs in its own savepoint. Normally it is committed right
+    away; in deferred mode the surrounding transaction stays open until
+    :meth:`flush`, so a batch of mutations costs one commit. On first start
+    an existing ``import_path`` snapshot is imported into the empty database,
+    and the import is recorded in the meta table, so a database emptied
+    later is not filled with the stale snapshot again.
+
+    The total number of ads is counted once and then maintained by the
+    mutations, since COUNT(*) has to scan the whole table.
+
+    A ``shared`` database is also written by other processes. Mutations
+    then take the write lock up front, and triggers record every change of
+    an ad in a change log. Every read and mutation first checks SQLite's
+    data_version; when another process has committed since, the log entries
+    after the last one seen are replayed to the listeners as "add", "like"
+    and "delete" events. Only a bulk replace, an edit, or entries already
+    trimmed from the log become a "replace".
+    """
+
+    def __init__(
+        self,
+        path: str = DB_FILE,
+        import_path: Optional[str] = None,
+        shared: bool = False,
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.import_path = import_path
+        self.shared = shared
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._count: Optional[int] = None
+        self._data_version: Optional[int] = None
+        # Last change log entry seen, None once unknown
+        self._seen: Optional[int] = None
+
+    @staticmethod
+    def _row_to_ad(row: sqlite3.Row) -> Dict[str, Any]:
+        ad = {
+            "id": row["id"],
+            "user_id": row["user_id"],
+            "type": row["type"],
+            "likes": row["likes"],
+        }
+        if row["type"] == "text":
+            ad["content"] = row["content"] or ""
+        else:
+            ad["file_id"] = row["file_id"] or ""
+            if row["caption"]:
+                ad["caption"] = row["caption"]
+        return ad
+
+    def load(self) -> None:
+        if self._conn is not None:
+            return
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        if self.shared:
+            conn.executescript(CHANGE_TRIGGERS)
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            self._seen = self._last_change(conn)
+        self._conn = conn
+
+        if self.import_path:
+            imported = self._execute(
+                "SELECT 1 FROM meta WHERE key = ?", (IMPORTED_KEY,)
+            )
+            if not imported:
+                self._import_json(self.import_path)
+
+        logger.info(f"Opened SQLite storage {self.path} with {self.count()} ads")
+
+    def _import_json(self, path: str) -> None:
+        ads: List[Dict[str, Any]] = []
+        next_id = 1
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    ads, next_id = decode_snapshot(f.read())
+            except SnapshotError as e:
+                # Not recorded, so the import is retried once the file is fixed
+                logger.error(f"Error importing ads from {path}: {e}")
+                return
+            index, next_id, _ = index_ads(ads, next_id)
+            ads = list(index.values())
+
+        imported = False
+        try:
+            with self._mutation() as conn:
+                # Another process may have imported in the meantime
+                done = conn.execute(
+                    "SELECT 1 FROM meta WHERE key = ?", (IMPORTED_KEY,)
+                ).fetchone()
+                if done is None:
+                    empty = conn.execute("SELECT 1 FROM ads LIMIT 1").fetchone() is None
+                    if ads and empty:
+                        since = self._last_change(conn)
+                        self._insert_ads(conn, ads)
+                        self._log_replace(conn, since)
+                        imported = True
+                    if empty:
+                        self._reserve_ids(conn, next_id)
+                    conn.execute(
+                        "INSERT INTO meta (key, value) VALUES (?, ?)",
+                        (IMPORTED_KEY, path),
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Error importing ads from {path}: {e}")
+            return
+
+        if imported:
+            self._notify("replace")
+            logger.info(f"Imported {len(ads)} ads from {path}")
+
+    @staticmethod
+    def _reserve_ids(conn: sqlite3.Connection, next_id: int) -> None:
+        """
+        Makes AUTOINCREMENT continue at ``next_id`` or later, so the IDs of
+        ads deleted before the import are not given to new ads.
+        """
+        cursor = conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'ads'",
+            (next_id - 1,),
+        )
+        if cursor.rowcount == 0:
+            conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('ads', ?)",
+                (next_id - 1,),
+            )
+
+    @staticmethod
+    def _last_change(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def _log_replace(self, conn: sqlite3.Connection, since: int) -> None:
+        """
+        Collapses the change log entries of a bulk change after ``since``
+        into one replace. Called inside _mutation().
+        """
+        if self.shared:
+            conn.execute("DELETE FROM changes WHERE seq > ?", (since,))
+            conn.execute("INSERT INTO changes (op) VALUES ('replace')")
+
+    def _changed_elsewhere(self) -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """
+        Returns the changes other processes committed since the last call
+        as mutation events. Called with the lock.
+        """
+        if not self.shared:
+            return []
+        conn = self._conn
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return []
+        self._data_version = version
+
+        if self._seen is None:
+            rows = []
+            lost = True
+        else:
+            rows = conn.execute(
+                "SELECT seq, op, ad_id, owner_id FROM changes "
+                "WHERE seq > ? ORDER BY seq",
+                (self._seen,),
+            ).fetchall()
+            if not rows:
+                return []
+            # Entries are numbered without gaps unless trimmed or collapsed
+            lost = rows[0]["seq"] != self._seen + 1
+        self._seen = rows[-1]["seq"] if rows else self._last_change(conn)
+
+        events = [(row["op"], row["ad_id"], row["owner_id"]) for row in rows]
+        if lost or any(op == "replace" for op, _, _ in events):
+            self._count = None
+            return [("replace", None, None)]
+        for op, _, _ in events:
+            if op == "add":
+                self._adjust_count(1)
+            elif op == "delete":
+                self._adjust_count(-1)
+        return events
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        self.load()
+        with self._lock:
+            events = self._changed_elsewhere()
+            rows = self._conn.execute(sql, params).fetchall()
+        for event in events:
+            self._notify(*event)
+        return rows
+
+    @contextmanager
+    def _mutation(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs the enclosed statements atomically and commits them unless
+        the backend is deferred.
+        """
+        self.load()
+        events: List[Tuple[str, Optional[int], Optional[int]]] = []
+        try:
+            with self._lock:
+                conn = self._conn
+                if not conn.in_transaction:
+                    # Another process may write between a read and the
+                    # upgrade to a write lock, which fails instead of waiting
+                    conn.execute("BEGIN IMMEDIATE" if self.shared else "BEGIN")
+                    # Holding the write lock, so every entry logged from
+                    # here on is this process's own
+                    events = self._changed_elsewhere()
+                conn.execute("SAVEPOINT mutation")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK TO mutation")
+                    conn.execute("RELEASE mutation")
+                    if not self.deferred:
+                        conn.execute("ROLLBACK")
+                    self._count = None
+                    raise
+
+                conn.execute("RELEASE mutation")
+                if self.shared:
+                    self._seen = self._last_change(conn)
+                if self.deferred:
+                    self._defer()
+                else:
+                    try:
+                        conn.execute("COMMIT")
+                    except sqlite3.Error:
+                        self._count = None
+                        self._seen = self._data_version = None
+                        raise
+        finally:
+            for event in events:
+                self._notify(*event)
+
+    def flush(self) -> int:
+        if self._conn is None:
+            return 0
+
+        with self._lock:
+            if not self._conn.in_transaction:
+                return 0
+            try:
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                logger.error(f"Error committing {self._pending} mutations: {e}")
+                self._count = None
+                return 0
+            flushed, self._pending = self._pending, 0
+        return flushed
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+                self._count = None
+
+    def all(self) -> List[Dict[str, Any]]:
+        rows = self._execute(f"SELECT {AD_COLUMNS} FROM ads ORDER BY id")
+        return [self._row_to_ad(row) for row in rows]
+
+    def count(self) -> int:
+        if self._count is not None and not self.shared:
+            return self._count
+
+        self.load()
+        with self._lock:
+            events = self._changed_elsewhere()
+            if self._count is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM ads").fetchone()
+                self._count = row[0]
+            count = self._count
+        for event in events:
+            self._notify(*event)
+        return count
+
+    def _adjust_count(self, delta: int) -> None:
+        # Only called inside _mutation(), which holds the lock
+        if self._count is not None:
+            self._count += delta
+
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        rows = self._execute(
+            f"SELECT {AD_COLUMNS} FROM ads ORDER BY id LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [self._row_to_ad(row) for row in rows]
+
+    def seek(
+        self,
+        cursor: Optional[int],
+        limit: int,
+        backward: bool = False,
+        user_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        conditions, params = [], []
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if cursor is not None:
+            conditions.append("id < ?" if backward else "id > ?")
+            params.append(cursor)
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        order = "DESC" if backward else "ASC"
+        rows = self._execute(
+            f"SELECT {AD_COLUMNS} FROM ads {where}ORDER BY id {order} LIMIT ?",
+            (*params, limit),
+        )
+        if backward:
+            rows.reverse()
+        return [self._row_to_ad(row) for row in rows]
+
+    def top(
+        self, cursor: Optional[Tuple[int, int]], limit: int, backward: bool = False
+    ) -> List[Dict[str, Any]]:
+        where, params = "", ()
+        if cursor is not None:
+            # Row values compare like the (likes, id) index is ordered
+            where = f"WHERE (likes, id) {'>' if backward else '<'} (?, ?) "
+            params = tuple(cursor)
+
+        order = "ASC" if backward else "DESC"
+        rows = self._execute(
+            f"SELECT {AD_COLUMNS} FROM ads {where}"
+            f"ORDER BY likes {order}, id {order} LIMIT ?",
+            (*params, limit),
+        )
+        if backward:
+            rows.reverse()
+        return [self._row_to_ad(row) for row in rows]
+
+    def _insert_ads(self, conn: sqlite3.Connection, ads: List[Dict[str, Any]]) -> None:
+        """
+        Inserts ads with their IDs and likers. Called inside _mutation().
+        """
+        for ad in ads:
+            conn.execute(
+                f"INSERT INTO ads ({AD_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ad["id"],
+                    ad["user_id"],
+                    ad["type"],
+                    ad.get("content"),
+                    ad.get("file_id"),
+                    ad.get("caption"),
+                    ad.get("likes", 0),
+                ),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO likes (ad_id, user_id) VALUES (?, ?)",
+                [(ad["id"], user_id) for user_id in ad.get("liked_by", [])],
+            )
+        self._count = len(ads)
+
+    def replace(self, ads: List[Dict[str, Any]]) -> bool:
+        try:
+            with self._mutation() as conn:
+                since = self._last_change(conn)
+                conn.execute("DELETE FROM likes")
+                conn.execute("DELETE FROM ads")
+                self._insert_ads(conn, ads)
+                self._log_replace(conn, since)
+            self._notify("replace")
+            logger.info(f"Saved {len(ads)} ads to {self.path}")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error saving ads: {e}")
+            return False
+
+    def add(self, new_ad: Dict[str, Any]) -> bool:
+        try:
+            with self._mutation() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO ads (user_id, type, content, file_id, caption, likes) "
+                    "VALUES (?, ?, ?, ?, ?, 0)",
+                    (
+                        new_ad["user_id"],
+                        new_ad["type"],
+                        new_ad.get("content"),
+                        new_ad.get("file_id"),
+                        new_ad.get("caption"),
+                    ),
+                )
+                self._adjust_count(1)
+            new_ad["id"] = cursor.lastrowid
+            self._notify("add", new_ad["id"], new_ad["user_id"])
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error saving ad: {e}")
+            return False
+
+    def user_ads(self, user_id: int) -> List[Dict[str, Any]]:
+        rows = self._execute(
+            f"SELECT {AD_COLUMNS} FROM ads WHERE user_id = ? ORDER BY id", (user_id,)
+        )
+        return [self._row_to_ad(row) for row in rows]
+
+    def user_count(self, user_id: int) -> int:
+        rows = self._execute("SELECT COUNT(*) FROM ads WHERE user_id = ?", (user_id,))
+        return rows[0][0]
+
+    def user_page(self, user_id: int, offset: int, limit: int) -> List[Dict[str, Any]]:
+        rows = self._execute(
+            f"SELECT {AD_COLUMNS} FROM ads WHERE user_id = ? "
+            "ORDER BY id LIMIT ? OFFSET ?",
+            (user_id, limit, offset),
+        )
+        return [self._row_to_ad(row) for row in rows]
+
+    def delete(self, ad_id: int, user_id: int) -> Optional[bool]:
+        try:
+            with self._mutation() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM ads WHERE id = ? AND user_id = ?", (ad_id, user_id)
+                )
+                self._adjust_count(-cursor.rowcount)
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting ad {ad_id}: {e}")
+            return False
+
+        if cursor.rowcount == 0:
+            return None
+        self._notify("delete", ad_id, user_id)
+        return True
+
+    def like(
+        self, ad_id: int, user_id: int
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        # Refused likes are answered without a write, so they neither count
+        # as a pending write-behind mutation nor commit an empty transaction
+        refusal = self._like_refusal(ad_id, user_id)
+        if refusal is not None:
+            return False, refusal, None
+
+        try:
+            with self._mutation() as conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO likes (ad_id, user_id) "
+                    "SELECT id, ? FROM ads WHERE id = ?",
+                    (user_id, ad_id),
+                )
+                if cursor.rowcount == 0:
+                    # Liked or deleted since the check
+                    raise _Unchanged
+                conn.execute("UPDATE ads SET likes = likes + 1 WHERE id = ?", (ad_id,))
+                liked = self._row_to_ad(
+                    conn.execute(
+                        f"SELECT {AD_COLUMNS} FROM ads WHERE id = ?", (ad_id,)
+                    ).fetchone()
+                )
+        except _Unchanged:
+            return False, self._like_refusal(ad_id, user_id) or ALREADY_LIKED, None
+        except sqlite3.Error as e:
+            logger.error(f"Error saving like for ad {ad_id}: {e}")
+            return False, LIKE_SAVE_FAILED, None
+
+        likes = liked["likes"]
+        self._notify("like", ad_id, liked["user_id"])
+        logger.info(f"User {user_id} liked ad {ad_id}, total likes: {likes}")
+        return True, liked_message(likes), liked
+
+    def _like_refusal(self, ad_id: int, user_id: int) -> Optional[str]:
+        """
+        Returns why a like of the user would be refused, or None.
+        """
+        exists, liked = self._execute(
+            "SELECT EXISTS (SELECT 1 FROM ads WHERE id = ?), "
+            "EXISTS (SELECT 1 FROM likes WHERE ad_id = ? AND user_id = ?)",
+            (ad_id, ad_id, user_id),
+        )[0]
+        if not exists:
+            logger.warning(f"Ad {ad_id} not found for liking")
+            return AD_NOT_FOUND
+        return ALREADY_LIKED if liked else None
+
+    def get(self, ad_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._execute(f"SELECT {AD_COLUMNS} FROM ads WHERE id = ?", (ad_id,))
+        return self._row_to_ad(rows[0]) if rows else None
@@ -0,0 +1,109 @@
+# utils/storage/write_behind.py
+import asyncio
+from collections import Counter
+from typing import Optional
+from utils.logger import get_logger
+from utils.storage.base import StorageBackend
+
+logger = get_logger(__name__)
+
+FLUSH_INTERVAL = 1.0
+MAX_BATCH = 100
+
+
+class WriteBehindBuffer:
+    """
+    Group-commits mutations of a storage backend.
+
+    While the buffer runs, the backend is switched to deferred mode: every
+    mutation is applied in memory and acknowledged at once, and a background
+    task writes the accumulated changes every ``interval`` seconds or as soon
+    as ``max_batch`` of them are pending. ``batch_sizes`` counts how many
+    mutations each flush coalesced.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        interval: float = FLUSH_INTERVAL,
+        max_batch: int = MAX_BATCH,
+    ) -> None:
+        self.backend = backend
+        self.interval = interval
+        self.max_batch = max_batch
+        self.batch_sizes: Counter[int] = Counter()
+        self.flushes = 0
+        self.flushed_mutations = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Switches the backend to deferred mode and starts the flush task.
+        Must be called from the running event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.backend.pending_listener = self._on_pending
+        self.backend.deferred = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Write-behind enabled: interval={self.interval}s, max_batch={self.max_batch}"
+        )
+
+    def _on_pending(self, pending: int) -> None:
+        # Called from the storage executor thread
+        if pending >= self.max_batch and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        from utils.storage import aio
+
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                break
+
+            # Keep the disk write off the event loop; the backend locks itself
+            try:
+                await aio.run_in_storage(self.flush)
+            except Exception as e:
+                # The mutations stay pending, so the next tick retries them
+                logger.exception(f"Write-behind flush failed, retrying: {e}")
+
+    def flush(self) -> int:
+        """
+        Writes all pending mutations synchronously.
+
+        Returns:
+            int: Number of mutations written by this flush
+        """
+        flushed = self.backend.flush()
+        if flushed:
+            self.flushes += 1
+            self.flushed_mutations += flushed
+            self.batch_sizes[flushed] += 1
+            logger.info(f"Flushed {flushed} mutations in one batch")
+        return flushed
+
+    async def stop(self) -> None:
+        """
+        Stops the flush task, letting a flush in progress finish. The caller
+        is responsible for the final :meth:`flush` once no more mutations
+        can arrive.
+        """
+        if self._task is not None:
+            # Cancelling could be lost when the wakeup fires at the same
+            # time, since wait_for() then returns instead of raising
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        self.backend.pending_listener = None
@@ -0,0 +1,193 @@
+# utils/webhook.py
+import asyncio
+import json
+import secrets
+import signal
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+WEBHOOK_PATH = "/webhook"
+# Updates are a few kilobytes; anything far larger is not from Telegram
+MAX_BODY_BYTES = 256 * 1024
+MAX_CONCURRENCY = 100
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """
+    Webhook request handler that processes at most ``max_concurrency``
+    updates at a time.
+
+    Each update is acknowledged as soon as it is read and processed in the
+    background, like aiogram's handler with ``handle_in_background``. When
+    every slot is taken the next request is only answered once one frees
+    up, so a burst backs up at Telegram, which keeps at most
+    ``max_connections`` requests open, instead of piling up in memory.
+    On shutdown the updates in progress are finished first.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        max_concurrency: int = MAX_CONCURRENCY,
+        secret_token: Optional[str] = None,
+        **data: Any,
+    ) -> None:
+        super().__init__(
+            dispatcher,
+            bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data,
+        )
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _handle_request_background(
+        self, bot: Bot, request: web.Request
+    ) -> web.Response:
+        try:
+            update = await request.json(loads=bot.session.json_loads)
+        except (ValueError, UnicodeDecodeError):
+            return web.Response(body="Bad Request", status=400)
+
+        await self._slots.acquire()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        task = asyncio.create_task(self._process_update(bot, update))
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def _process_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        try:
+            await self._background_feed_update(bot, update)
+        except Exception as e:
+            logger.exception(f"Failed to process update {update.get('update_id')}: {e}")
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def close(self) -> None:
+        """
+        Waits for the updates in progress, then closes the bot session.
+        """
+        if self._background_feed_update_tasks:
+            logger.info(
+                f"Waiting for {len(self._background_feed_update_tasks)} updates"
+            )
+            await asyncio.gather(*self._background_feed_update_tasks)
+        logger.info(f"Webhook: at most {self.max_in_flight} updates in progress")
+        await super().close()
+
+
+def create_webhook_app(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    path: str = WEBHOOK_PATH,
+    secret_token: Optional[str] = None,
+    max_body_bytes: int = MAX_BODY_BYTES,
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> web.Application:
+    """
+    Builds the aiohttp application receiving updates at ``path``.
+
+    The dispatcher's startup and shutdown hooks run with the application's,
+    after the handler has finished the updates in progress.
+
+    Args:
+        dispatcher: Dispatcher processing the updates
+        bot: Bot the updates are for
+        path: URL path Telegram posts the updates to
+        secret_token: Required X-Telegram-Bot-Api-Secret-Token header, None
+            to accept any request
+        max_body_bytes: Largest accepted request body
+        max_concurrency: Most updates processed at a time
+
+    Returns:
+        web.Application: Application to serve
+    """
+    app = web.Application(client_max_size=max_body_bytes)
+    handler = BoundedRequestHandler(
+        dispatcher, bot, max_concurrency=max_concurrency, secret_token=secret_token
+    )
+    # Registered first, so its shutdown waits for updates before the
+    # dispatcher's shutdown hooks run
+    handler.register(app, path=path)
+    setup_application(app, dispatcher, bot=bot)
+    return app
+
+
+async def serve(app: web.Application, host: str, port: int) -> None:
+    """
+    Serves an application until SIGTERM or SIGINT arrives or the task is
+    cancelled, then runs the application's shutdown hooks.
+    """
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    signals = []
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, stopped.set)
+            signals.append(signum)
+        except (NotImplementedError, RuntimeError):
+            # Not supported on Windows, or outside the main thread
+            pass
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        logger.info(f"Listening for webhook updates on {host}:{port}")
+        await stopped.wait()
+        logger.info("Stop signal received, shutting down the webhook server")
+    finally:
+        for signum in signals:
+            loop.remove_signal_handler(signum)
+        await runner.cleanup()
+
+
+def create_ingress_app(
+    dispatch: Callable[[Dict[str, Any]], Awaitable[None]],
+    path: str = WEBHOOK_PATH,
+    secret_token: Optional[str] = None,
+    max_body_bytes: int = MAX_BODY_BYTES,
+) -> web.Application:
+    """
+    Builds an aiohttp application that only hands the raw updates posted
+    to ``path`` to ``dispatch``, for an ingress process in front of
+    workers.
+
+    Args:
+        dispatch: Awaited with every update before the request is answered
+        path: URL path Telegram posts the updates to
+        secret_token: Required X-Telegram-Bot-Api-Secret-Token header, None
+            to accept any request
+        max_body_bytes: Largest accepted request body
+
+    Returns:
+        web.Application: Application to serve
+    """
+
+    async def handle(request: web.Request) -> web.Response:
+        if secret_token and not secrets.compare_digest(
+            request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), secret_token
+        ):
+            return web.Response(body="Unauthorized", status=401)
+        try:
+            update = json.loads(await request.read())
+        except (ValueError, UnicodeDecodeError):
+            return web.Response(body="Bad Request", status=400)
+        await dispatch(update)
+        return web.json_response({})
+
+    app = web.Application(client_max_size=max_body_bytes)
+    app.router.add_post(path, handle)
+    return app
@@ -0,0 +1,257 @@
+# utils/workers.py
+import asyncio
+import json
+import multiprocessing
+import queue as queue_module
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from aiohttp import ClientError, ClientTimeout
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds Telegram holds a getUpdates request open while there are none
+POLL_TIMEOUT = 30
+# Seconds to wait after a failed getUpdates request
+POLL_RETRY_DELAY = 1.0
+# Updates a worker accepts before one of them is handled
+MAX_PENDING = 1000
+# Updates waiting in a worker's queue before dispatching to it waits
+MAX_QUEUED = 1000
+
+
+def update_user_id(update: Dict[str, Any]) -> int:
+    """
+    Returns the ID of the user who caused an update, or of its chat for
+    updates without a user (channel posts), or 0.
+    """
+    for event in update.values():
+        if isinstance(event, dict):
+            user = event.get("from") or event.get("user") or event.get("chat")
+            if isinstance(user, dict) and "id" in user:
+                return user["id"]
+    return 0
+
+
+class WorkerPool:
+    """
+    Fans raw updates out to worker processes over multiprocessing queues.
+
+    Every update goes to the worker ``user_id % workers``, so all updates of
+    a user reach one process in the order they were dispatched.
+    Workers are spawned with ``target(index, queue)`` and stop once they
+    read None from their queue. A queue holds at most ``max_queued``
+    updates; dispatching to a full one waits, which slows down receiving
+    updates to the pace of the workers.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        target: Callable[[int, multiprocessing.Queue], None],
+        max_queued: int = MAX_QUEUED,
+    ) -> None:
+        self.workers = workers
+        self.target = target
+        self.max_queued = max_queued
+        self.dispatched = [0] * workers
+        self._context = multiprocessing.get_context("spawn")
+        self._queues: List[multiprocessing.Queue] = []
+        self._processes: List[multiprocessing.Process] = []
+        # Keep the updates of a worker in order while its queue is full
+        self._put_locks: List[asyncio.Lock] = []
+
+    def start(self) -> None:
+        """
+        Starts the worker processes.
+        """
+        for index in range(self.workers):
+            queue = self._context.Queue(self.max_queued)
+            process = self._context.Process(
+                target=self.target, args=(index, queue), name=f"worker-{index}"
+            )
+            process.start()
+            self._queues.append(queue)
+            self._processes.append(process)
+            self._put_locks.append(asyncio.Lock())
+        logger.info(f"Started {self.workers} worker processes")
+
+    def dispatch(self, update: Dict[str, Any]) -> None:
+        """
+        Hands an update to the worker of its user, blocking while the
+        worker's queue is full.
+        """
+        index = update_user_id(update) % self.workers
+        self._queues[index].put(update)
+        self.dispatched[index] += 1
+
+    async def submit(self, update: Dict[str, Any]) -> None:
+        """
+        Hands an update to the worker of its user, waiting off the event
+        loop while the worker's queue is full.
+        """
+        index = update_user_id(update) % self.workers
+        queue = self._queues[index]
+        async with self._put_locks[index]:
+            try:
+                queue.put_nowait(update)
+            except queue_module.Full:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, queue.put, update)
+        self.dispatched[index] += 1
+
+    def stop(self) -> None:
+        """
+        Lets the workers finish the updates already dispatched and waits
+        for them to exit.
+        """
+        for queue in self._queues:
+            queue.put(None)
+        for process in self._processes:
+            process.join()
+        logger.info(f"Workers stopped after handling {self.dispatched} updates")
+
+
+async def run_worker(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    queue: multiprocessing.Queue,
+    max_pending: int = MAX_PENDING,
+    **kwargs: Any,
+) -> int:
+    """
+    Feeds the updates of a worker queue to a dispatcher until None is read.
+
+    Updates are handed to the dispatcher in queue order and handled
+    concurrently; :class:`middlewares.ordering.ChatOrderingMiddleware`
+    keeps each chat's updates in order. At most ``max_pending`` updates are
+    taken from the queue before one of them finishes. The dispatcher's
+    startup and shutdown hooks run around the loop.
+
+    Args:
+        dispatcher: Dispatcher handling the updates
+        bot: Bot the updates are for
+        queue: Queue filled by :meth:`WorkerPool.dispatch`
+        max_pending: Most updates accepted and not yet handled
+        kwargs: Passed to the startup and shutdown hooks
+
+    Returns:
+        int: Number of handled updates
+    """
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    pending = threading.Semaphore(max_pending)
+    tasks: Set[asyncio.Task] = set()
+    handled = 0
+
+    async def handle(update: Dict[str, Any]) -> None:
+        nonlocal handled
+        try:
+            result = await dispatcher.feed_raw_update(bot, update, **kwargs)
+            if isinstance(result, TelegramMethod):
+                await dispatcher.silent_call_request(bot, result)
+        except Exception as e:
+            logger.exception(f"Failed to handle update {update.get('update_id')}: {e}")
+        finally:
+            handled += 1
+            pending.release()
+
+    def submit(update: Dict[str, Any]) -> None:
+        task = loop.create_task(handle(update))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    def read_queue() -> None:
+        # Blocking reads stay off the event loop
+        while pending.acquire() and (update := queue.get()) is not None:
+            loop.call_soon_threadsafe(submit, update)
+        loop.call_soon_threadsafe(stopped.set)
+
+    await dispatcher.emit_startup(bot=bot, **kwargs)
+    try:
+        threading.Thread(target=read_queue, name="worker-queue", daemon=True).start()
+        await stopped.wait()
+        if tasks:
+            await asyncio.wait(list(tasks))
+    finally:
+        await dispatcher.emit_shutdown(bot=bot, **kwargs)
+    return handled
+
+
+async def poll_updates(
+    bot: Bot,
+    dispatch: Callable[[Dict[str, Any]], Awaitable[None]],
+    allowed_updates: Optional[List[str]] = None,
+    timeout: int = POLL_TIMEOUT,
+    stopped: Optional[asyncio.Event] = None,
+) -> None:
+    """
+    Long-polls Telegram and dispatches every raw update until ``stopped``
+    is set.
+
+    The responses are parsed as plain JSON only; turning updates into
+    aiogram objects is left to the workers. The next request is only sent
+    once every update of a response has been dispatched. On stop a pending
+    request is abandoned and the dispatched updates are confirmed to
+    Telegram, so they are not received again.
+
+    Args:
+        bot: Bot to poll for
+        dispatch: Awaited with every update
+        allowed_updates: Update types to receive, None for Telegram's default
+        timeout: Seconds Telegram may hold a request open
+        stopped: Event ending the polling, None to poll until cancelled
+    """
+    url = bot.session.api.api_url(token=bot.token, method="getUpdates")
+    params: Dict[str, Any] = {"timeout": timeout}
+    request_timeout = ClientTimeout(total=timeout + 10)
+    if allowed_updates is not None:
+        params["allowed_updates"] = allowed_updates
+    if stopped is None:
+        stopped = asyncio.Event()
+
+    async def get_updates(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        session = await bot.session.create_session()
+        try:
+            async with session.post(url, json=params, timeout=request_timeout) as resp:
+                return json.loads(await resp.read())
+        except (ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"Failed to get updates: {e}")
+            return None
+
+    async def pause(delay: float) -> None:
+        try:
+            await asyncio.wait_for(stopped.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    while not stopped.is_set():
+        request = asyncio.ensure_future(get_updates(params))
+        stopping = asyncio.ensure_future(stopped.wait())
+        await asyncio.wait((request, stopping), return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        if not request.done():
+            request.cancel()
+            break
+
+        response = request.result()
+        if response is None:
+            await pause(POLL_RETRY_DELAY)
+            continue
+
+        if not response.get("ok"):
+            retry_after = response.get("parameters", {}).get("retry_after")
+            logger.error(f"Failed to get updates: {response.get('description')}")
+            await pause(retry_after or POLL_RETRY_DELAY)
+            continue
+
+        for update in response["result"]:
+            await dispatch(update)
+            params["offset"] = update["update_id"] + 1
+
+    if "offset" in params:
+        # Telegram confirms the updates before the offset; the one update
+        # this may return stays unconfirmed and is received on the next start
+        await get_updates({**params, "timeout": 0, "limit": 1})